@@ -0,0 +1,110 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from lab1 import DFALexer, Lexer, LexerGenerator, LexerSpec
+
+lab1_dir = os.path.dirname(os.path.abspath(__file__))
+testcase_dir = os.path.join(lab1_dir, "testcase")
+sys.path.insert(0, os.path.join(lab1_dir, "..", "lab3"))
+
+from lab3 import LRAnalyzer
+
+# statements over the classes of testcase/input.txt, = is a comparison operator there
+statements_grammar = ["Stmts -> Stmts Stmt | Stmt",
+                      "Stmt -> id = Expr ; | while ( Expr ) do Stmts end ; | printf ( Expr ) ;",
+                      "Expr -> Expr + Term | Expr - Term | Term",
+                      "Term -> Term * Factor | Term / Factor | Factor",
+                      "Factor -> ( Expr ) | id | num"]
+
+statements = ["x1 = ( a + 3.5 ) * b2 - 7 ;\n",
+              "while ( i ) do y = y / 2 ; end ;\n",
+              "printf ( x1 * 10 ) ;\n"]
+
+
+# a source text of about size bytes
+def makeSource(size:int) -> str:
+    out = []
+    total = 0
+    i = 0
+    while total < size:
+        x = statements[i % len(statements)]
+        out.append(x)
+        total += len(x)
+        i += 1
+    return "".join(out)
+
+
+# lexer is a Lexer or a DFALexer, name is printed in front
+def benchTokenize(lexer, sizes:list, name:str = "tokenize"):
+    for size in sizes:
+        text = makeSource(size)
+        start = time.perf_counter()
+        tokens = lexer.tokenize(text)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        lexer.tokenize(text)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print("{:<8} {:>10}B  tokens: {:>9}  {:>7.2f} MB/s  {:>10.0f} tokens/s  array: {:>5.1f}B/token  peak: {:>10}B".format(
+            name, len(text), len(tokens), len(text) / elapsed / 1e6, len(tokens) / elapsed,
+            tokens.sizeInBytes() / len(tokens), peak))
+
+
+# build the DFA of spec, then load it from a cache directory, and check the DFA
+# lexer gives the same tokens as Lexer
+def benchGenerator(spec:LexerSpec):
+    rules = LexerGenerator.specRules(spec)
+    start = time.perf_counter()
+    generator = LexerGenerator(rules)
+    build = time.perf_counter() - start
+    table = generator.table
+    print("generate  rules: {}  NFA states: {}  DFA states: {}  minimized: {}  classes: {}  table: {}B  {:.2f}ms".format(
+        len(rules), len(generator.nfa.eps), generator.dfa_state_count, table.stateCount(),
+        table.class_count, table.sizeInBytes(), build * 1000))
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        LexerGenerator.cachedTable(rules, cache_dir)
+        start = time.perf_counter()
+        cached = LexerGenerator.cachedTable(rules, cache_dir)
+        load = time.perf_counter() - start
+    finally:
+        shutil.rmtree(cache_dir)
+    print("cached    load: {:.3f}ms  same table: {}".format(load * 1000, cached.toBytes() == table.toBytes()))
+
+    text = makeSource(100000)
+    a = Lexer(spec).tokenize(text)
+    b = DFALexer(table).tokenize(text)
+    same = True
+    for (x, y) in [(a.kind, b.kind), (a.offset, b.offset), (a.length, b.length), (a.row, b.row), (a.col, b.col)]:
+        same = same and x == y
+    print("dfa tokens same as Lexer: {}".format(same))
+
+
+# tokenize and parse with LRAnalyzer.parseStream, the lexer feeds the parser directly
+def benchParse(lexer:Lexer, sizes:list):
+    lra = LRAnalyzer(statements_grammar, "?", "START", "#", LRAnalyzer.Mode.LALR1)
+    lra.compile()
+    for size in sizes:
+        text = makeSource(size)
+        start = time.perf_counter()
+        tokens = lexer.tokenize(text)
+        status = lra.parseStream(Lexer.terminalValues(tokens))
+        elapsed = time.perf_counter() - start
+        print("parse    {:>10}B  tokens: {:>9}  accepted: {}  {:>7.2f} MB/s  {:>10.0f} tokens/s".format(
+            len(text), len(tokens), status, len(text) / elapsed / 1e6, len(tokens) / elapsed))
+
+
+if __name__ == "__main__":
+    (spec, source) = LexerSpec.read(os.path.join(testcase_dir, "input.txt"))
+    lexer = Lexer(spec)
+    benchTokenize(lexer, [100000, 1000000, 10000000])
+    benchParse(lexer, [100000, 1000000])
+    benchGenerator(spec)
+    benchTokenize(DFALexer.fromSpec(spec), [100000, 1000000], "dfa")
@@ -0,0 +1,745 @@
+import os
+import re
+import struct
+import sys
+from array import array
+
+
+class TokenKind:
+    '''Same numbers as TokenType in lab1.cc, Error is a lexeme lab1.cc reports as Error'''
+    Keyword = 0
+    Identifier = 1
+    Separator = 2
+    Constant = 3
+    AlgOp = 4
+    CmpOp = 5
+    Error = 6
+
+    names = ["KeyWord", "Identifier", "Separator", "Constant", "Algrithm operator", "Comparsion operator", "Error"]
+
+
+class LexerSpec:
+    '''The token classes lab1.cc reads with input_stub, keywords, separators (single
+    characters), algorithm operators and comparison operators'''
+
+    def __init__(self, keywords:list, separators:list, alg_ops:list, cmp_ops:list):
+        self.keywords = keywords
+        self.separators = separators
+        self.alg_ops = alg_ops
+        self.cmp_ops = cmp_ops
+
+    # read the file lab1.cc takes on stdin, like testcase/input.txt: four sections of
+    # a count and the items, then the source file name, which is returned too
+    @staticmethod
+    def read(path:str) -> tuple:
+        f = open(path, "r")
+        words = f.read().split()
+        f.close()
+        sections = []
+        pos = 0
+        while len(sections) < 4:
+            n = int(words[pos])
+            sections.append(words[pos + 1:pos + 1 + n])
+            pos += 1 + n
+        source = None
+        if pos < len(words):
+            source = words[pos]
+        return (LexerSpec(sections[0], sections[1], sections[2], sections[3]), source)
+
+
+class TokenArray:
+    '''Tokens of a text in parallel arrays, token i is text[offset[i]:offset[i] + length[i]],
+    row and col are 1 based and count characters'''
+
+    def __init__(self, text:str):
+        self.text = text
+        self.kind = array("b")
+        self.offset = array("q")
+        self.length = array("i")
+        self.row = array("i")
+        self.col = array("i")
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def value(self, i:int) -> str:
+        return self.text[self.offset[i]:self.offset[i] + self.length[i]]
+
+    def sizeInBytes(self) -> int:
+        ret = 0
+        for x in [self.kind, self.offset, self.length, self.row, self.col]:
+            ret += x.itemsize * len(x)
+        return ret
+
+
+class Lexer:
+    '''The scanner of lab1.cc for bulk input. One compiled pattern finds the lexemes,
+    constants, identifiers and runs of symbols, and the classes are looked up in sets and
+    dicts instead of the linear is_in searches. A run of symbols is split at the separators
+    and every other part has to be a whole operator, as in lab1.cc.'''
+
+    Pattern = re.compile(r"[0-9][0-9A-Za-z.]*|[A-Za-z][0-9A-Za-z]*|[^ \t\r\n0-9A-Za-z]+")
+    ValidConstant = re.compile(r"[0-9]+(\.[0-9]*)?")
+
+    def __init__(self, spec:LexerSpec):
+        self.spec = spec
+        self.keywords = set(spec.keywords)
+        self.separators = set(spec.separators)
+        self.operators = {}
+        for x in spec.cmp_ops:
+            self.operators[x] = TokenKind.CmpOp
+        # lab1.cc tries the algorithm operators first
+        for x in spec.alg_ops:
+            self.operators[x] = TokenKind.AlgOp
+        # lexeme -> its tokens, a tuple of (kind, offset in the lexeme, length), most
+        # lexemes of a text repeat, so each one is classified once
+        self.lexemes = {}
+
+    # the tokens of a lexeme the pattern found, only a run of symbols makes more than one
+    def classify(self, lexeme:str) -> tuple:
+        # the ASCII ranges of the pattern, str.isdigit and str.isalpha take other chars too
+        c = lexeme[0]
+        if "0" <= c <= "9":
+            if self.ValidConstant.fullmatch(lexeme):
+                return ((TokenKind.Constant, 0, len(lexeme)),)
+            return ((TokenKind.Error, 0, len(lexeme)),)
+        if "A" <= c <= "Z" or "a" <= c <= "z":
+            if lexeme in self.keywords:
+                return ((TokenKind.Keyword, 0, len(lexeme)),)
+            return ((TokenKind.Identifier, 0, len(lexeme)),)
+
+        # a run of symbols, every separator is a token and the parts between them are operators
+        ret = []
+        part_start = 0
+        i = 0
+        while i <= len(lexeme):
+            if i == len(lexeme) or lexeme[i] in self.separators:
+                if i != part_start:
+                    ret.append((self.operators.get(lexeme[part_start:i], TokenKind.Error), part_start, i - part_start))
+                if i != len(lexeme):
+                    ret.append((TokenKind.Separator, i, 1))
+                part_start = i + 1
+            i += 1
+        return tuple(ret)
+
+    def tokenize(self, text:str) -> TokenArray:
+        tokens = TokenArray(text)
+        kind = tokens.kind
+        offset = tokens.offset
+        length = tokens.length
+        rows = tokens.row
+        cols = tokens.col
+        lexemes = self.lexemes
+        finditer = self.Pattern.finditer
+
+        # line by line, the row is the same for every token of a line
+        row = 1
+        line_start = 0
+        text_len = len(text)
+        while line_start <= text_len:
+            line_end = text.find("\n", line_start)
+            if line_end == -1:
+                line_end = text_len
+            for m in finditer(text, line_start, line_end):
+                (start, end) = m.span()
+                lexeme = text[start:end]
+                parts = lexemes.get(lexeme)
+                if parts is None:
+                    parts = self.classify(lexeme)
+                    lexemes[lexeme] = parts
+                for (k, part_offset, part_length) in parts:
+                    kind.append(k)
+                    offset.append(start + part_offset)
+                    length.append(part_length)
+                    rows.append(row)
+                    cols.append(start + part_offset - line_start + 1)
+            row += 1
+            line_start = line_end + 1
+        return tokens
+
+    def tokenizeFile(self, path:str) -> TokenArray:
+        f = open(path, "r")
+        text = f.read()
+        f.close()
+        return self.tokenize(text)
+
+    # the terminal strs of the tokens for LRAnalyzer.parseStream, identifiers and constants
+    # become id_name and const_name, the others their own text. An Error lexeme is not a
+    # terminal of the grammar, so the parse stops there
+    @staticmethod
+    def terminalValues(tokens:TokenArray, id_name:str = "id", const_name:str = "num"):
+        text = tokens.text
+        kind = tokens.kind
+        offset = tokens.offset
+        length = tokens.length
+        i = 0
+        while i < len(kind):
+            k = kind[i]
+            if k == TokenKind.Identifier:
+                yield id_name
+            elif k == TokenKind.Constant:
+                yield const_name
+            else:
+                yield text[offset[i]:offset[i] + length[i]]
+            i += 1
+
+
+class NFA:
+    '''Thompson NFA of a list of regexes. A regex has chars, escapes with \\, ., [...] and
+    [^...] sets with ranges, (), |, *, + and ?. A char set is (frozenset of chars, negated),
+    only ASCII chars can be named, every other char is in the negated sets.'''
+
+    Escapes = {"n": "\n", "t": "\t", "r": "\r"}
+
+    def __init__(self):
+        self.eps = []
+        # state -> list of (char set id, next state)
+        self.moves = []
+        self.charsets = []
+        self.charset_ids = {}
+        # accepting state -> rule index
+        self.accept = {}
+        self.start = self.newState()
+
+    def newState(self) -> int:
+        self.eps.append([])
+        self.moves.append([])
+        return len(self.eps) - 1
+
+    def charsetId(self, chars:frozenset, negated:bool) -> int:
+        for x in chars:
+            if ord(x) > 127:
+                raise ValueError("only ASCII chars can be used in a pattern, got {!r}".format(x))
+        key = (chars, negated)
+        if key not in self.charset_ids:
+            self.charset_ids[key] = len(self.charsets)
+            self.charsets.append(key)
+        return self.charset_ids[key]
+
+    # add the pattern of rule index rule, its accepting state returns rule
+    def addPattern(self, pattern:str, rule:int):
+        self.pattern = pattern
+        self.pos = 0
+        (start, end) = self.parseAlt()
+        if self.pos != len(pattern):
+            raise ValueError("unbalanced ) in pattern {!r}".format(pattern))
+        self.eps[self.start].append(start)
+        self.accept[end] = rule
+
+    def peek(self):
+        if self.pos < len(self.pattern):
+            return self.pattern[self.pos]
+        return None
+
+    def parseAlt(self) -> tuple:
+        (start, end) = self.parseSeq()
+        if self.peek() != "|":
+            return (start, end)
+        alt_start = self.newState()
+        alt_end = self.newState()
+        self.eps[alt_start].append(start)
+        self.eps[end].append(alt_end)
+        while self.peek() == "|":
+            self.pos += 1
+            (start, end) = self.parseSeq()
+            self.eps[alt_start].append(start)
+            self.eps[end].append(alt_end)
+        return (alt_start, alt_end)
+
+    def parseSeq(self) -> tuple:
+        start = self.newState()
+        end = start
+        while self.peek() != None and self.peek() not in "|)":
+            (x_start, x_end) = self.parseRepeat()
+            self.eps[end].append(x_start)
+            end = x_end
+        return (start, end)
+
+    def parseRepeat(self) -> tuple:
+        (start, end) = self.parseAtom()
+        while self.peek() != None and self.peek() in "*+?":
+            op = self.peek()
+            self.pos += 1
+            r_start = self.newState()
+            r_end = self.newState()
+            self.eps[r_start].append(start)
+            self.eps[end].append(r_end)
+            if op != "+":
+                self.eps[r_start].append(r_end)
+            if op != "?":
+                self.eps[end].append(start)
+            (start, end) = (r_start, r_end)
+        return (start, end)
+
+    def parseAtom(self) -> tuple:
+        c = self.peek()
+        if c == None or c in "*+?":
+            raise ValueError("nothing to repeat at {} in pattern {!r}".format(self.pos, self.pattern))
+        self.pos += 1
+        if c == "(":
+            ret = self.parseAlt()
+            if self.peek() != ")":
+                raise ValueError("missing ) in pattern {!r}".format(self.pattern))
+            self.pos += 1
+            return ret
+        if c == "[":
+            sid = self.parseSet()
+        elif c == ".":
+            sid = self.charsetId(frozenset("\n"), True)
+        else:
+            if c == "\\":
+                c = self.parseEscape()
+            sid = self.charsetId(frozenset(c), False)
+        start = self.newState()
+        end = self.newState()
+        self.moves[start].append((sid, end))
+        return (start, end)
+
+    def parseEscape(self) -> str:
+        if self.pos >= len(self.pattern):
+            raise ValueError("trailing \\ in pattern {!r}".format(self.pattern))
+        c = self.pattern[self.pos]
+        self.pos += 1
+        return NFA.Escapes.get(c, c)
+
+    def parseSet(self) -> int:
+        negated = False
+        if self.peek() == "^":
+            negated = True
+            self.pos += 1
+        chars = set()
+        first = True
+        while True:
+            c = self.peek()
+            if c == None:
+                raise ValueError("missing ] in pattern {!r}".format(self.pattern))
+            self.pos += 1
+            # ] right after [ or [^ is a char
+            if c == "]" and not first:
+                break
+            first = False
+            if c == "\\":
+                c = self.parseEscape()
+            if self.peek() == "-" and self.pos + 1 < len(self.pattern) and self.pattern[self.pos + 1] != "]":
+                self.pos += 1
+                last = self.pattern[self.pos]
+                self.pos += 1
+                if last == "\\":
+                    last = self.parseEscape()
+                if ord(last) < ord(c):
+                    raise ValueError("bad range {}-{} in pattern {!r}".format(c, last, self.pattern))
+                for x in range(ord(c), ord(last) + 1):
+                    chars.add(chr(x))
+            else:
+                chars.add(c)
+        return self.charsetId(frozenset(chars), negated)
+
+    def closure(self, states) -> frozenset:
+        ret = set(states)
+        stack = list(states)
+        while len(stack) != 0:
+            s = stack.pop()
+            for t in self.eps[s]:
+                if t not in ret:
+                    ret.add(t)
+                    stack.append(t)
+        return frozenset(ret)
+
+
+class DFATable:
+    '''A minimized lexer DFA in flat arrays. class_map[c] is the char class of ASCII c,
+    class_map[128] the class of every other char. next[s * class_count + c] is the state
+    after class c, state 0 is the dead state. accept[s] is the TokenKind of the longest
+    lexeme ending in s, DFATable.Skip for whitespace or -1.'''
+    Magic = b"LXDT"
+    Version = 1
+    # magic, version, state count, class count, start state
+    HeaderFormat = "<4sIIII"
+    Skip = -2
+
+    def __init__(self, class_map:bytes, class_count:int, next_state:array, accept:array, start:int):
+        self.class_map = class_map
+        self.class_count = class_count
+        self.next = next_state
+        self.accept = accept
+        self.start = start
+
+    def stateCount(self) -> int:
+        return len(self.accept)
+
+    def sizeInBytes(self) -> int:
+        return len(self.class_map) + self.next.itemsize * len(self.next) + len(self.accept)
+
+    def toBytes(self) -> bytes:
+        next_state = self.next
+        if sys.byteorder == "big":
+            next_state = array("i", next_state)
+            next_state.byteswap()
+        out = [struct.pack(DFATable.HeaderFormat, DFATable.Magic, DFATable.Version, len(self.accept),
+                           self.class_count, self.start),
+               self.class_map, b"\0" * (-len(self.class_map) % 4), next_state.tobytes(), self.accept.tobytes()]
+        return b"".join(out)
+
+    # returns None if data is not a table of this version
+    @staticmethod
+    def fromBytes(data:bytes):
+        header_len = struct.calcsize(DFATable.HeaderFormat)
+        if len(data) < header_len:
+            return None
+        (magic, version, state_count, class_count, start) = struct.unpack_from(DFATable.HeaderFormat, data)
+        if magic != DFATable.Magic or version != DFATable.Version:
+            return None
+        pos = header_len
+        class_map = bytes(data[pos:pos + 129])
+        pos += 132
+        if len(data) != pos + 4 * state_count * class_count + state_count:
+            return None
+        next_state = array("i")
+        next_state.frombytes(data[pos:pos + 4 * state_count * class_count])
+        if sys.byteorder == "big":
+            next_state.byteswap()
+        pos += 4 * state_count * class_count
+        accept = array("b")
+        accept.frombytes(data[pos:])
+        return DFATable(class_map, class_count, next_state, accept, start)
+
+    def save(self, path:str):
+        tmp_path = path + ".{}.tmp".format(os.getpid())
+        f = open(tmp_path, "wb")
+        f.write(self.toBytes())
+        f.close()
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path:str):
+        try:
+            f = open(path, "rb")
+            data = f.read()
+            f.close()
+        except OSError:
+            return None
+        return DFATable.fromBytes(data)
+
+
+class LexerGenerator:
+    '''Builds a DFATable from rules, a list of (TokenKind or DFATable.Skip, pattern). On a
+    tie of lengths the earlier rule wins, so keywords come before identifiers. The chars
+    are split into classes the patterns cannot tell apart, then the subset construction
+    makes the DFA and Hopcroft's algorithm minimizes it.'''
+
+    def __init__(self, rules:list):
+        self.rules = rules
+        self.nfa = NFA()
+        i = 0
+        while i < len(rules):
+            self.nfa.addPattern(rules[i][1], i)
+            i += 1
+        self.makeClasses()
+        self.makeDFA()
+        self.minimize()
+
+    # chars in the same sets get the same class, the char sets become lists of classes
+    def makeClasses(self):
+        charsets = self.nfa.charsets
+        signatures = {}
+        class_map = []
+        c = 0
+        while c < 129:
+            if c < 128:
+                sig = tuple([(chr(c) in chars) != negated for (chars, negated) in charsets])
+            else:
+                sig = tuple([negated for (chars, negated) in charsets])
+            if sig not in signatures:
+                signatures[sig] = len(signatures)
+            class_map.append(signatures[sig])
+            c += 1
+        self.class_map = bytes(class_map)
+        self.class_count = len(signatures)
+
+        self.charset_classes = []
+        for (chars, negated) in charsets:
+            classes = set()
+            c = 0
+            while c < 129:
+                if (c < 128 and (chr(c) in chars) != negated) or (c == 128 and negated):
+                    classes.add(class_map[c])
+                c += 1
+            self.charset_classes.append(sorted(classes))
+
+    def makeDFA(self):
+        nfa = self.nfa
+        # the empty set is the dead state 0
+        dstates = {frozenset(): 0}
+        self.dfa_next = [[0] * self.class_count]
+        self.dfa_accept = [-1]
+        worklist = [nfa.closure([nfa.start])]
+        dstates[worklist[0]] = 1
+        self.dfa_next.append(None)
+        self.dfa_accept.append(-1)
+        while len(worklist) != 0:
+            d = worklist.pop()
+            targets = [set() for x in range(self.class_count)]
+            rule = None
+            for s in d:
+                for (sid, t) in nfa.moves[s]:
+                    for c in self.charset_classes[sid]:
+                        targets[c].add(t)
+                if s in nfa.accept and (rule == None or nfa.accept[s] < rule):
+                    rule = nfa.accept[s]
+            row = []
+            for x in targets:
+                x = nfa.closure(x)
+                if x not in dstates:
+                    dstates[x] = len(self.dfa_next)
+                    self.dfa_next.append(None)
+                    self.dfa_accept.append(-1)
+                    worklist.append(x)
+                row.append(dstates[x])
+            self.dfa_next[dstates[d]] = row
+            if rule != None:
+                self.dfa_accept[dstates[d]] = self.rules[rule][0]
+        self.dfa_state_count = len(self.dfa_next)
+
+    # Hopcroft's partition refinement, the first blocks are the states by accepted kind
+    def minimize(self):
+        n = self.dfa_state_count
+        k = self.class_count
+        # inverse[c][t] is the states going to t on class c
+        inverse = [[[] for t in range(n)] for c in range(k)]
+        s = 0
+        while s < n:
+            c = 0
+            while c < k:
+                inverse[c][self.dfa_next[s][c]].append(s)
+                c += 1
+            s += 1
+
+        block_ids = {}
+        blocks = []
+        block_of = [0] * n
+        s = 0
+        while s < n:
+            a = self.dfa_accept[s]
+            if a not in block_ids:
+                block_ids[a] = len(blocks)
+                blocks.append(set())
+            blocks[block_ids[a]].add(s)
+            block_of[s] = block_ids[a]
+            s += 1
+
+        waiting = set(range(len(blocks)))
+        while len(waiting) != 0:
+            splitter = list(blocks[waiting.pop()])
+            c = 0
+            while c < k:
+                # the states of each block that go into the splitter on c
+                touched = {}
+                for t in splitter:
+                    for x in inverse[c][t]:
+                        b = block_of[x]
+                        if b not in touched:
+                            touched[b] = []
+                        touched[b].append(x)
+                for (b, xs) in touched.items():
+                    if len(xs) == len(blocks[b]):
+                        continue
+                    new_b = len(blocks)
+                    blocks.append(set(xs))
+                    blocks[b].difference_update(xs)
+                    for x in xs:
+                        block_of[x] = new_b
+                    if b in waiting or len(xs) <= len(blocks[b]):
+                        waiting.add(new_b)
+                    else:
+                        waiting.add(b)
+                c += 1
+
+        # renumber the blocks, the dead state stays 0 and the others go breadth first from the start
+        number = {block_of[0]: 0}
+        order = [block_of[0], block_of[1]]
+        number[block_of[1]] = 1
+        i = 1
+        while i < len(order):
+            s = next(iter(blocks[order[i]]))
+            for t in self.dfa_next[s]:
+                b = block_of[t]
+                if b not in number:
+                    number[b] = len(order)
+                    order.append(b)
+            i += 1
+
+        next_state = array("i")
+        accept = array("b")
+        for b in order:
+            s = next(iter(blocks[b]))
+            for t in self.dfa_next[s]:
+                next_state.append(number[block_of[t]])
+            accept.append(self.dfa_accept[s])
+        self.table = DFATable(self.class_map, k, next_state, accept, 1)
+
+    # the rules of the lab1.cc classes, every lexeme lab1.cc reports as Error is matched by
+    # one of the error patterns, which are longer than any proper token they start with
+    @staticmethod
+    def specRules(spec:LexerSpec, identifier:str = "[A-Za-z][0-9A-Za-z]*",
+                  constant:str = "[0-9]+(\\.[0-9]*)?") -> list:
+        rules = [(DFATable.Skip, "[ \t\r\n]+")]
+        for x in spec.keywords:
+            rules.append((TokenKind.Keyword, re.escape(x)))
+        for x in spec.separators:
+            rules.append((TokenKind.Separator, re.escape(x)))
+        for x in spec.alg_ops:
+            rules.append((TokenKind.AlgOp, re.escape(x)))
+        for x in spec.cmp_ops:
+            rules.append((TokenKind.CmpOp, re.escape(x)))
+        rules.append((TokenKind.Constant, constant))
+        rules.append((TokenKind.Identifier, identifier))
+        rules.append((TokenKind.Error, "[0-9][0-9A-Za-z.]*"))
+        symbols = "".join(sorted(set([re.escape(x) for x in spec.separators])))
+        rules.append((TokenKind.Error, "[^ \t\r\n0-9A-Za-z" + symbols + "]+"))
+        return rules
+
+    @staticmethod
+    def rulesKey(rules:list) -> str:
+        lines = [DFATable.Magic.decode(), str(DFATable.Version)]
+        for (kind, pattern) in rules:
+            lines.append("{} {}".format(kind, pattern))
+        import hashlib
+        return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+    # the table of rules from the cache directory, built and stored there if it is not
+    @staticmethod
+    def cachedTable(rules:list, cache_dir:str = None) -> DFATable:
+        if cache_dir == None:
+            return LexerGenerator(rules).table
+        path = os.path.join(cache_dir, LexerGenerator.rulesKey(rules) + ".lxdt")
+        table = DFATable.load(path)
+        if table == None:
+            table = LexerGenerator(rules).table
+            os.makedirs(cache_dir, exist_ok = True)
+            table.save(path)
+        return table
+
+
+class DFALexer:
+    '''Runs a DFATable over a text, the longest match wins. The text is turned into a
+    bytes of char classes at once, the loop only indexes flat arrays. Fills the same
+    TokenArray as Lexer.'''
+    NonASCII = re.compile("[^\\x00-\\x7f]")
+
+    def __init__(self, table:DFATable):
+        self.table = table
+        self.translation = {}
+        c = 0
+        while c < 128:
+            self.translation[c] = chr(table.class_map[c])
+            c += 1
+        self.other = chr(table.class_map[128])
+        k = table.class_count
+        # next holds the state times class_count, so a step is one index and no multiply
+        self.next = array("i", [x * k for x in table.next])
+        # accept indexed the same way
+        self.accept = array("b", [-1]) * (table.stateCount() * k)
+        s = 0
+        while s < table.stateCount():
+            self.accept[s * k] = table.accept[s]
+            s += 1
+        self.start = table.start * k
+
+    @staticmethod
+    def fromSpec(spec:LexerSpec, cache_dir:str = None):
+        return DFALexer(LexerGenerator.cachedTable(LexerGenerator.specRules(spec), cache_dir))
+
+    def tokenize(self, text:str) -> TokenArray:
+        tokens = TokenArray(text)
+        kind = tokens.kind
+        offset = tokens.offset
+        length = tokens.length
+        rows = tokens.row
+        cols = tokens.col
+        next_state = self.next
+        accept = self.accept
+        start = self.start
+
+        codes = text.translate(self.translation)
+        if not codes.isascii():
+            codes = DFALexer.NonASCII.sub(self.other, codes)
+        codes = codes.encode("latin-1")
+
+        row = 1
+        line_start = 0
+        pos = 0
+        end = len(codes)
+        while pos < end:
+            s = start
+            i = pos
+            last_kind = TokenKind.Error
+            last_end = pos + 1
+            while i < end:
+                s = next_state[s + codes[i]]
+                if s == 0:
+                    break
+                i += 1
+                a = accept[s]
+                if a != -1:
+                    last_kind = a
+                    last_end = i
+            if last_kind != DFATable.Skip:
+                kind.append(last_kind)
+                offset.append(pos)
+                length.append(last_end - pos)
+                rows.append(row)
+                cols.append(pos - line_start + 1)
+            else:
+                # whitespace is the only lexeme with new lines
+                nl = text.rfind("\n", pos, last_end)
+                if nl != -1:
+                    row += text.count("\n", pos, last_end)
+                    line_start = nl + 1
+            pos = last_end
+        return tokens
+
+    def tokenizeFile(self, path:str) -> TokenArray:
+        f = open(path, "r")
+        text = f.read()
+        f.close()
+        return self.tokenize(text)
+
+
+# print the tokens of a source file like lab1.cc, the spec is a file like testcase/input.txt
+# lab1.py SPEC [SOURCE], SOURCE defaults to the file name at the end of SPEC
+def main(argv:list) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog = "lab1.py", description = "tokenize a source file like lab1.cc")
+    parser.add_argument("spec", help = "token classes, like testcase/input.txt")
+    parser.add_argument("source", nargs = "?", help = "source file, defaults to the name at the end of spec")
+    parser.add_argument("--dfa", action = "store_true", help = "use the generated minimized DFA")
+    parser.add_argument("--cache", help = "directory of cached DFA tables, implies --dfa")
+    args = parser.parse_args(argv)
+
+    (spec, source) = LexerSpec.read(args.spec)
+    if args.source != None:
+        source = args.source
+    if source == None:
+        parser.error("no source file in spec, give one")
+    if args.dfa or args.cache != None:
+        lexer = DFALexer.fromSpec(spec, args.cache)
+    else:
+        lexer = Lexer(spec)
+    tokens = lexer.tokenizeFile(source)
+    out = []
+    i = 0
+    while i < len(tokens):
+        k = tokens.kind[i]
+        value = tokens.value(i)
+        rc = "({}, {})".format(tokens.row[i], tokens.col[i])
+        if k == TokenKind.Error:
+            out.append("{:<20}{:<20}{:<20}{:<20}".format(value, "Error", "Error", rc))
+        else:
+            out.append("{:<20}{:<20}{:<20}{:<20}".format(value, "({}, {})".format(k, value), TokenKind.names[k], rc))
+        i += 1
+    sys.stdout.write("\n".join(out) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
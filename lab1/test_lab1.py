@@ -0,0 +1,90 @@
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+from lab1 import DFALexer, DFATable, Lexer, LexerGenerator, LexerSpec, TokenKind
+
+testcase_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testcase")
+
+
+def readText(name:str) -> str:
+    f = open(os.path.join(testcase_dir, name), "r")
+    text = f.read()
+    f.close()
+    return text
+
+
+class DFALexerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        (cls.spec, source) = LexerSpec.read(os.path.join(testcase_dir, "input.txt"))
+        cls.lexer = Lexer(cls.spec)
+        cls.dfa_lexer = DFALexer.fromSpec(cls.spec)
+
+    def assertSameTokens(self, text:str):
+        expected = self.lexer.tokenize(text)
+        tokens = self.dfa_lexer.tokenize(text)
+        for field in ["kind", "offset", "length", "row", "col"]:
+            self.assertEqual(getattr(tokens, field), getattr(expected, field), "{} of {!r}".format(field, text))
+
+    def testCases(self):
+        for name in ["input.txt", "book.txt"]:
+            self.assertSameTokens(readText(name))
+
+    def testTrickyInputs(self):
+        for text in ["3.14.5", "<=+", "<>", "<> <= >=", "4a", "3.", "a.b", "é", "x1é2", "a\té\nb",
+                     "do1 do", "", " \n ", "+-/*/ ++ ======="]:
+            self.assertSameTokens(text)
+
+    # short strings over the chars where the token classes meet
+    def testRandomInputs(self):
+        chars = "abdo fr3.9x\n\t<=>()[];,+-*/%é_"
+        rand = random.Random(1)
+        i = 0
+        while i < 1000:
+            self.assertSameTokens("".join([rand.choice(chars) for j in range(rand.randint(0, 30))]))
+            i += 1
+
+    def testKinds(self):
+        cases = [("3.14.5", [TokenKind.Error]), ("<=+", [TokenKind.Error]), ("<>", [TokenKind.CmpOp]),
+                 ("x1é2", [TokenKind.Identifier, TokenKind.Error, TokenKind.Constant]),
+                 ("do 3.14 ;", [TokenKind.Keyword, TokenKind.Constant, TokenKind.Separator])]
+        for (text, kinds) in cases:
+            self.assertEqual(list(self.dfa_lexer.tokenize(text).kind), kinds, text)
+
+
+class DFATableTest(unittest.TestCase):
+
+    def setUp(self):
+        (spec, source) = LexerSpec.read(os.path.join(testcase_dir, "input.txt"))
+        self.rules = LexerGenerator.specRules(spec)
+        self.table = LexerGenerator(self.rules).table
+
+    def assertSameTable(self, table:DFATable, expected:DFATable):
+        self.assertEqual(table.class_map, expected.class_map)
+        self.assertEqual(table.class_count, expected.class_count)
+        self.assertEqual(table.next, expected.next)
+        self.assertEqual(table.accept, expected.accept)
+        self.assertEqual(table.start, expected.start)
+
+    def testRoundTrip(self):
+        data = self.table.toBytes()
+        self.assertSameTable(DFATable.fromBytes(data), self.table)
+        self.assertEqual(DFATable.fromBytes(data[:-1]), None)
+        self.assertEqual(DFATable.fromBytes(b"XXXX" + data[4:]), None)
+
+    def testCachedTable(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            self.assertSameTable(LexerGenerator.cachedTable(self.rules, cache_dir), self.table)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            self.assertSameTable(LexerGenerator.cachedTable(self.rules, cache_dir), self.table)
+        finally:
+            shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from lab2 import LLAnalyzer, LLResult
+
+lab2_dir = os.path.dirname(os.path.abspath(__file__))
+testcase_dir = os.path.join(lab2_dir, "testcase")
+backend_path = os.path.join(lab2_dir, "..", "build", "lab2", "lab2")
+if len(sys.argv) > 1:
+    backend_path = sys.argv[1]
+
+
+# a testcase file is the stdin of lab2.cc, returns (productions, sentence)
+def readCase(path:str) -> tuple:
+    f = open(path, "r")
+    words = f.read().split()
+    f.close()
+    n = int(words[0])
+    return (words[1:1 + n], words[1 + n] if len(words) > 1 + n else "")
+
+
+# a sum of n numbers in the syntax of case2.txt
+def longSentence(n:int) -> str:
+    out = []
+    i = 0
+    while i < n:
+        out.append(str(i % 10))
+        i += 1
+    return "+".join(out)
+
+
+def timeIt(f, repeat:int) -> float:
+    start = time.perf_counter()
+    i = 0
+    while i < repeat:
+        f()
+        i += 1
+    return (time.perf_counter() - start) / repeat
+
+
+def benchInProcess(cases:list, repeat:int):
+    for (name, productions, sentence) in cases:
+        lla = LLAnalyzer(productions)
+        analysis = timeIt(lambda: LLAnalyzer(productions), repeat)
+        parse = timeIt(lambda: lla.analyze(sentence), repeat)
+        result = lla.analyze(sentence)
+        print("{:<12} analysis: {:>8.3f}ms  parse: {:>8.3f}ms  steps: {:>6}  accepted: {}".format(
+            name, analysis * 1000, parse * 1000, len(result.process), result.accepted()))
+
+
+# the --json output of the lab2 binary decoded from its pipe by LLResult.readJson,
+# which is what lab2gui.py --backend does
+def readBackend(stdin:bytes) -> LLResult:
+    proc = subprocess.Popen([backend_path, "--json"], stdin = subprocess.PIPE, stdout = subprocess.PIPE)
+    proc.stdin.write(stdin)
+    proc.stdin.close()
+    try:
+        return LLResult.readJson(proc.stdout)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+# the lab2 binary, its text output, its --json output decoded at once by json.loads
+# and decoded from the pipe while it is written
+def benchBackend(cases:list, repeat:int):
+    if not os.path.exists(backend_path):
+        print("no lab2 backend at {}, build it to compare".format(backend_path))
+        return
+    for (name, productions, sentence) in cases:
+        stdin = "{}\n{}\n{}".format(len(productions), "\n".join(productions), sentence).encode()
+        text = timeIt(lambda: subprocess.run([backend_path], input = stdin, stdout = subprocess.PIPE), repeat)
+        loads = timeIt(lambda: json.loads(subprocess.run([backend_path, "--json"], input = stdin,
+                                                         stdout = subprocess.PIPE).stdout), repeat)
+        stream = timeIt(lambda: readBackend(stdin), repeat)
+        print("{:<12} lab2 process: {:>8.3f}ms  --json with json.loads: {:>8.3f}ms  read from the pipe: {:>8.3f}ms".format(
+            name, text * 1000, loads * 1000, stream * 1000))
+
+
+if __name__ == "__main__":
+    cases = []
+    for x in sorted(os.listdir(testcase_dir)):
+        if not (x.startswith("case") and x.endswith(".txt")):
+            continue
+        (productions, sentence) = readCase(os.path.join(testcase_dir, x))
+        cases.append((x, productions, sentence))
+    (productions, sentence) = readCase(os.path.join(testcase_dir, "case2.txt"))
+    cases.append(("long", productions, longSentence(2000)))
+    benchInProcess(cases, 20)
+    benchBackend(cases, 20)
@@ -6,6 +6,8 @@
 #include <set>
 #include <functional>
 #include <iomanip>
+#include <cstdio>
+#include <string_view>
 
 
 
@@ -474,7 +476,10 @@ auto predictTableGen(const std::map<char, Symbol> syms,const std::map<char, std:
 }
 
 
-void predictiveAnalysis(const std::map<char, std::map<char, std::string>> table, const std::string & in,const char start) {
+// row(symbol stack, input, action) is called with every step as it is made,
+// an error is row("ERROR", what, where)
+template<typename Row>
+void predictiveAnalysis(const std::map<char, std::map<char, std::string>> table, const std::string & in,const char start, Row && row) {
     std::string sym_stack;
     size_t input_pos = 0;
     sym_stack.push_back('#');
@@ -485,13 +490,12 @@ void predictiveAnalysis(const std::map<char, std::map<char, std::string>> table,
     std::string last_sym_stack = in;
     size_t last_input_pos = 0;
 
-    auto pretty_print = [&last_sym_stack, &last_input_pos, &input](const std::string & p) {
-        std::cout << last_sym_stack << '\t' << (input.c_str() + last_input_pos) << '\t' << p << std::endl;
-
+    auto pretty_print = [&row, &last_sym_stack, &last_input_pos, &input](const std::string & p) {
+        row(last_sym_stack, std::string_view{input}.substr(last_input_pos), p);
     };
 
-    auto error_print = [](const std::string & e1, const std::string & e2){
-        std::cout << "ERROR" << '\t' << e1 << '\t' << e2 <<std::endl;
+    auto error_print = [&row](const std::string & e1, const std::string & e2){
+        row("ERROR", e1, e2);
     };
 
     while(!sym_stack.empty() && input_pos != input.size()) {
@@ -542,9 +546,138 @@ void predictiveAnalysis(const std::map<char, std::map<char, std::string>> table,
 }
 
 
+// a JSON string for operator<<, the runs without a char to escape are written at once
+struct JsonString {
+    std::string_view s;
+};
+
+std::ostream & operator<<(std::ostream & os, const JsonString & js) {
+    os << '"';
+    size_t start = 0;
+    for(size_t i = 0; i < js.s.size(); ++i) {
+        unsigned char c = js.s[i];
+        if(c != '"' && c != '\\' && c >= 0x20) {
+            continue;
+        }
+        os.write(js.s.data() + start, i - start);
+        if(c == '"' || c == '\\') {
+            os << '\\' << js.s[i];
+        } else {
+            char buf[8];
+            std::snprintf(buf, sizeof(buf), "\\u%04x", c);
+            os << buf;
+        }
+        start = i + 1;
+    }
+    os.write(js.s.data() + start, js.s.size() - start);
+    os << '"';
+    return os;
+}
+
+JsonString jsonString(const std::string & s) {
+    return JsonString{s};
+}
+
+struct JsonChar {
+    char c;
+};
+
+std::ostream & operator<<(std::ostream & os, const JsonChar & jc) {
+    return os << JsonString{std::string_view{&jc.c, 1}};
+}
+
+JsonChar jsonString(char c) {
+    return JsonChar{c};
+}
 
+// a map of a symbol to its set as an object of arrays, one symbol a line
+void printJsonSets(const std::map<char, std::set<char>> & sets) {
+    std::cout << "{";
+    bool first_item = true;
+    for(auto && [x, y] : sets) {
+        // the entry of the char after the end of a production, see firstfollowSetGen
+        if(x == '\0') {
+            continue;
+        }
+        std::cout << (first_item ? "\n" : ",\n") << jsonString(x) << ": [";
+        first_item = false;
+        bool first_sym = true;
+        for(auto && z : y) {
+            std::cout << (first_sym ? "" : ", ") << jsonString(z);
+            first_sym = false;
+        }
+        std::cout << "]";
+    }
+    std::cout << "}";
+}
 
-int main(void) {
+// the result as one JSON document, the keys are the sections of the text output
+// and the big ones are written a row a line. It is written up to the rows of
+// "process", which are written by printJsonRow while the sentence is analyzed
+void printJsonStart(bool check, const std::map<char, Symbol> & syms,
+const std::map<char, std::set<char>> & first,
+const std::map<char, std::set<char>> & follow,
+const std::map<char, bool> & nullable,
+const std::map<char, std::map<char, std::string>> & table) {
+    std::cout << "{\"check\": " << (check ? "true" : "false") << ",\n";
+
+    std::cout << "\"productions\": [";
+    bool first_item = true;
+    for(auto && [x, y] : syms) {
+        if(y.isTerminal()) {
+            continue;
+        }
+        std::cout << (first_item ? "\n" : ",\n") << "[" << jsonString(x) << ", [";
+        first_item = false;
+        auto && candi = y.getCandidates();
+        for(size_t i = 0; i < candi.size(); ++i) {
+            std::cout << (i ? ", " : "") << jsonString(candi[i]);
+        }
+        std::cout << "]]";
+    }
+    std::cout << "],\n";
+
+    std::cout << "\"first\": ";
+    printJsonSets(first);
+    std::cout << ",\n\"follow\": ";
+    printJsonSets(follow);
+
+    std::cout << ",\n\"nullable\": {";
+    first_item = true;
+    for(auto && [x, y] : nullable) {
+        std::cout << (first_item ? "" : ", ") << jsonString(x) << ": " << (y ? "true" : "false");
+        first_item = false;
+    }
+    std::cout << "},\n";
+
+    std::cout << "\"table\": {";
+    first_item = true;
+    for(auto && [x1, y1] : table) {
+        std::cout << (first_item ? "\n" : ",\n") << jsonString(x1) << ": {";
+        first_item = false;
+        bool first_cell = true;
+        for(auto && [x2, y2] : y1) {
+            std::cout << (first_cell ? "" : ", ") << jsonString(x2) << ": " << jsonString(y2);
+            first_cell = false;
+        }
+        std::cout << "}";
+    }
+    std::cout << "},\n";
+
+    std::cout << "\"process\": [";
+}
+
+void printJsonRow(bool first_row, std::string_view stack, std::string_view input, std::string_view action) {
+    std::cout << (first_row ? "\n" : ",\n") << "[" << JsonString{stack} << ", "
+        << JsonString{input} << ", " << JsonString{action} << "]";
+}
+
+
+
+
+// lab2 [--json], with --json the result is one JSON document instead of the marked sections
+int main(int argc, char **argv) {
+    bool json = argc > 1 && std::string{argv[1]} == "--json";
     std::vector<std::string> productions;
     int n;
     std::cin >> n;
@@ -600,6 +733,18 @@ int main(void) {
 #endif // DEBUG
 
     bool check = checkLL(syms2, first, follow, nullable);
+    if(json) {
+        printJsonStart(check, syms2, first, follow, nullable, table);
+        bool first_row = true;
+        predictiveAnalysis(table, sentence, start_char,
+            [&first_row](std::string_view stack, std::string_view input, std::string_view action) {
+            printJsonRow(first_row, stack, input, action);
+            first_row = false;
+        });
+        std::cout << "]}\n";
+        return 0;
+    }
+
     std::cout << "CHECK_START#\n";
     std::cout << check << '\n';
     std::cout << "CHECK_END#\n";
@@ -658,7 +803,10 @@ int main(void) {
     std::cout << "TABLE_END#\n";
 
     std::cout << "PROCESS_START#\n";
-    predictiveAnalysis(table, sentence, start_char);
+    predictiveAnalysis(table, sentence, start_char,
+        [](std::string_view stack, std::string_view input, std::string_view action) {
+        std::cout << stack << '\t' << input << '\t' << action << std::endl;
+    });
     std::cout << "PROCESS_END#\n";
     return 0;
 }
\ No newline at end of file
@@ -0,0 +1,513 @@
+import codecs
+import json
+import sys
+
+
+class LLResult:
+    '''What lab2.cc prints for a grammar and a sentence. productions is a list of
+    (nonterminal, candidates), first and follow map each symbol to a set, nullable
+    each symbol to a bool, table[nonterminal][terminal] is a candidate and process
+    is a list of (symbol stack, input, action), an error is ("ERROR", what, where)'''
+    __slots__ = ["check", "productions", "first", "follow", "nullable", "table", "process"]
+
+    def __init__(self, check:bool, productions:list, first:dict, follow:dict, nullable:dict, table:dict, process:list):
+        self.check = check
+        self.productions = productions
+        self.first = first
+        self.follow = follow
+        self.nullable = nullable
+        self.table = table
+        self.process = process
+
+    def accepted(self) -> bool:
+        for (stack, input_str, action) in self.process:
+            if stack == "ERROR":
+                return False
+        return len(self.process) != 0
+
+    # the text lab2.cc prints, with its markers
+    def toText(self) -> str:
+        out = ["CHECK_START#", str(int(self.check)), "CHECK_END#", "PRODUCTIONS_START#"]
+        for (x, candidates) in self.productions:
+            out.append(x + "->" + "|".join(candidates))
+        out.append("PRODUCTIONS_END#")
+        out.append("FIRST_START#")
+        for x in sorted(self.first):
+            out.append(x + ":" + "".join([y + "," for y in sorted(self.first[x])]))
+        out.append("FIRST_END#")
+        out.append("FOLLOW_START#")
+        for x in sorted(self.follow):
+            out.append(x + ": " + "".join([y + "," for y in sorted(self.follow[x])]))
+        out.append("FOLLOW_END#")
+        out.append("NULLABLE_START#")
+        for x in sorted(self.nullable):
+            out.append(x + ":" + str(int(self.nullable[x])))
+        out.append("NULLABLE_END#")
+        out.append("TABLE_START#")
+        for x in sorted(self.table):
+            for y in sorted(self.table[x]):
+                out.append("T({}, {}) = {} -> {}".format(x, y, x, self.table[x][y]))
+        out.append("TABLE_END#")
+        out.append("PROCESS_START#")
+        for x in self.process:
+            out.append("\t".join(x))
+        out.append("PROCESS_END#")
+        return "\n".join(out) + "\n"
+
+    # the document lab2.cc writes with --json
+    def toJson(self) -> str:
+        doc = {"check": self.check,
+               "productions": [[x, y] for (x, y) in self.productions],
+               "first": {x: sorted(self.first[x]) for x in sorted(self.first)},
+               "follow": {x: sorted(self.follow[x]) for x in sorted(self.follow)},
+               "nullable": {x: self.nullable[x] for x in sorted(self.nullable)},
+               "table": {x: {y: self.table[x][y] for y in sorted(self.table[x])} for x in sorted(self.table)},
+               "process": [list(x) for x in self.process]}
+        return json.dumps(doc) + "\n"
+
+    # the LLResult of a toJson document read from a binary stream, like the stdout of
+    # lab2 --json. It is decoded while it is read, a row of "process" at a time
+    @staticmethod
+    def readJson(stream, chunk_size:int = 65536):
+        reader = JsonReader(stream, chunk_size)
+        doc = {}
+        process = []
+        reader.expect("{")
+        while True:
+            key = reader.value()
+            reader.expect(":")
+            if key == "process":
+                reader.expect("[")
+                if reader.peek() == "]":
+                    reader.expect("]")
+                else:
+                    process.append(tuple(reader.value()))
+                    while reader.separator("]") == ",":
+                        process.append(tuple(reader.value()))
+            else:
+                doc[key] = reader.value()
+            if reader.separator("}") == "}":
+                break
+        for key in ["check", "productions", "first", "follow", "nullable", "table"]:
+            if not key in doc:
+                raise ValueError("no {!r} in the JSON document".format(key))
+        first = {x: set(y) for (x, y) in doc["first"].items()}
+        follow = {x: set(y) for (x, y) in doc["follow"].items()}
+        productions = [(x, y) for (x, y) in doc["productions"]]
+        return LLResult(doc["check"], productions, first, follow, doc["nullable"], doc["table"], process)
+
+
+class JsonReader:
+    '''JSON values one after another from a binary stream, for documents too big to
+    wait for. Only the unread rest of the last chunk is kept, a value which is not
+    complete yet is decoded again when the next chunk is there. A document that
+    ends early or breaks the syntax raises ValueError.'''
+    Decoder = json.JSONDecoder()
+    Space = " \t\r\n"
+
+    def __init__(self, stream, chunk_size:int = 65536):
+        # read1 returns what the pipe has, read would wait for a full chunk
+        self.read = getattr(stream, "read1", stream.read)
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    # append the next chunk, False at the end of the stream
+    def more(self) -> bool:
+        if self.eof:
+            return False
+        data = self.read(self.chunk_size)
+        if len(data) == 0:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + self.decoder.decode(data, self.eof)
+        self.pos = 0
+        return not self.eof
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in JsonReader.Space:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.more():
+                raise ValueError("unexpected end of the JSON document")
+
+    # the next char out of the whitespace, one of the separators {}[]:,
+    def next(self) -> str:
+        c = self.peek()
+        if not c in "{}[]:,":
+            raise ValueError("unexpected {!r} in the JSON document".format(c))
+        self.pos += 1
+        return c
+
+    # a comma, or close which ends the array or object
+    def separator(self, close:str) -> str:
+        c = self.next()
+        if c != "," and c != close:
+            raise ValueError("expected ',' or {!r} in the JSON document".format(close))
+        return c
+
+    def expect(self, c:str):
+        if self.next() != c:
+            raise ValueError("expected {!r} in the JSON document".format(c))
+
+    # read until the unread part is twice as long, so a value longer than a chunk
+    # is decoded again only a logarithmic number of times
+    def grow(self) -> bool:
+        size = len(self.buf) - self.pos
+        while self.more():
+            if len(self.buf) - self.pos >= 2 * size:
+                break
+        return len(self.buf) - self.pos > size
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                (value, end) = JsonReader.Decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self.grow():
+                    continue
+                raise
+            # a number or a literal at the end of the chunk may go on in the next one
+            if end == len(self.buf) and not self.eof and not self.buf[end - 1] in "\"]}":
+                self.grow()
+                continue
+            self.pos = end
+            return value
+
+
+class LLAnalyzer:
+    '''The LL(1) analysis of lab2.cc in process. Symbols are single chars, ? is the
+    empty string and # the end of the input, the first production gives the start
+    symbol. symbols maps a nonterminal to its list of candidates and a terminal to None.
+    Every step follows the lab2.cc function of the same name, symbols are visited in
+    char order like its std::map, so the results are the ones lab2.cc prints.'''
+    Epsilon = "?"
+    Guard = "#"
+
+    def __init__(self, productions:list):
+        if len(productions) == 0:
+            raise ValueError("no productions")
+        self.start = productions[0][0]
+        self.symbols = LLAnalyzer.symsGen(productions)
+        self.symbols = LLAnalyzer.removeLeftRecur(self.symbols)
+        self.symbols = LLAnalyzer.removeRedundantSymbols(self.symbols, self.start)
+        (self.first, self.follow, self.nullable) = LLAnalyzer.firstfollowSetGen(self.symbols, self.start)
+        self.table = LLAnalyzer.predictTableGen(self.symbols, self.first, self.follow, self.nullable)
+        self.check = LLAnalyzer.checkLL(self.symbols, self.first, self.follow, self.nullable)
+
+    # productions like "E->E+T|T", without spaces
+    @staticmethod
+    def symsGen(productions:list) -> dict:
+        symbols = {}
+        for x in productions:
+            pos = x.find("->")
+            if pos == -1:
+                raise ValueError("can not find \"->\" in a production : " + x)
+            if pos != 1:
+                raise ValueError("production format error, production : " + x)
+            candidates = x[pos + 2:].split("|")
+            if candidates.count("") != 0:
+                raise ValueError("empty candidate in production : " + x)
+            symbols[x[0]] = candidates
+            for c in x[pos + 2:]:
+                if c != "|" and c not in symbols:
+                    symbols[c] = None
+        return symbols
+
+    @staticmethod
+    def removeLeftRecur(symbols:dict) -> dict:
+        used = set(symbols)
+
+        def nextUnusedChar() -> str:
+            i = 0
+            while i < 26:
+                for c in [chr(ord("A") + i), chr(ord("a") + i)]:
+                    if c not in used:
+                        used.add(c)
+                        return c
+                i += 1
+            raise ValueError("no unused letter left for a new nonterminal")
+
+        # first step, substitute the candidates of the nonterminals before, so every
+        # left recursion becomes direct
+        ret1 = dict(symbols)
+        order = [x for x in sorted(symbols) if symbols[x] != None]
+        order_map = {}
+        for x in order:
+            order_map[x] = len(order_map)
+        i = 0
+        # every pass over order[i] substitutes only candidates the pass before made, after more
+        # passes than nonterminals a nonterminal came back to the front, so the substitution
+        # never ends, lab2.cc loops there
+        passes = 0
+        while i < len(order):
+            passes += 1
+            if passes > len(order) + 1:
+                raise ValueError("can not remove the left recursion of {}, a substitution comes back to it".format(order[i]))
+            candidates = []
+            replace_occur = False
+            for st in ret1[order[i]]:
+                left = st[0]
+                if ret1[left] != None and order_map[left] < i:
+                    replace_occur = True
+                    alpha = st[1:]
+                    for lst in ret1[left]:
+                        if lst[0] == LLAnalyzer.Epsilon:
+                            # lab2.cc leaves an empty candidate here
+                            candidates.append(alpha if alpha != "" else LLAnalyzer.Epsilon)
+                        else:
+                            candidates.append(lst + alpha)
+                else:
+                    candidates.append(st)
+            ret1[order[i]] = candidates
+            # substituted candidates can start with a nonterminal before again
+            if not replace_occur:
+                i += 1
+                passes = 0
+
+        # second step, remove the direct left recursion
+        ret2 = dict(ret1)
+        for x in sorted(ret1):
+            if ret1[x] == None:
+                continue
+            alpha = []
+            beta = []
+            for st in ret1[x]:
+                if st[0] == x:
+                    alpha.append(st[1:])
+                else:
+                    beta.append(st)
+            if len(alpha) != 0:
+                if len(beta) == 0:
+                    raise ValueError("every candidate of {} is left recursive".format(x))
+                nc = nextUnusedChar()
+                ret2[x] = [y + nc for y in beta]
+                ret2[nc] = [y + nc for y in alpha] + [LLAnalyzer.Epsilon]
+        return ret2
+
+    @staticmethod
+    def removeRedundantSymbols(symbols:dict, start:str) -> dict:
+        visited = set()
+        buf = [start]
+        while len(buf) != 0:
+            c = buf.pop()
+            if c in visited:
+                continue
+            visited.add(c)
+            if symbols[c] != None:
+                for st in symbols[c]:
+                    for x in st:
+                        if x != LLAnalyzer.Epsilon and symbols[x] != None:
+                            buf.append(x)
+        ret = {}
+        for x in symbols:
+            if symbols[x] == None or x in visited:
+                ret[x] = symbols[x]
+        return ret
+
+    # returns (first, follow, nullable). Like lab2.cc the symbols a production names are
+    # looked up with a default, so ? gets entries even if no production has it
+    @staticmethod
+    def firstfollowSetGen(symbols:dict, start:str) -> tuple:
+        first = {}
+        follow = {}
+        nullable = {}
+        for x in symbols:
+            if symbols[x] == None:
+                first[x] = set([x])
+            else:
+                first[x] = set()
+            follow[x] = set()
+            nullable[x] = False
+        nullable[LLAnalyzer.Epsilon] = True
+        follow.setdefault(start, set()).add(LLAnalyzer.Guard)
+
+        def allNullable(p:str, start:int, end:int) -> bool:
+            i = start
+            while i < end:
+                if not nullable.setdefault(p[i], False):
+                    return False
+                i += 1
+            return True
+
+        nonterminals = [x for x in sorted(symbols) if symbols[x] != None]
+        flag = True
+        while flag:
+            flag = False
+            for x in nonterminals:
+                first_old_size = len(first[x])
+                nullable_old_value = nullable[x]
+                for p in symbols[x]:
+                    pos = 0
+                    while pos < len(p) and nullable.setdefault(p[pos], False):
+                        first[x] |= first.setdefault(p[pos], set())
+                        pos += 1
+                    if pos < len(p):
+                        first[x] |= first.setdefault(p[pos], set())
+                    else:
+                        nullable[x] = True
+
+                    i = 0
+                    while i < len(p):
+                        if allNullable(p, i + 1, len(p)):
+                            # lab2.cc checks the symbol after p[i] for a change, not p[i]
+                            after = p[i + 1] if i + 1 < len(p) else "\0"
+                            old = len(follow.setdefault(after, set()))
+                            follow[p[i]] = follow[x] | follow.setdefault(p[i], set())
+                            if old != len(follow[after]):
+                                flag = True
+                        i += 1
+
+                    i = 0
+                    while i < len(p) - 1:
+                        j = i + 1
+                        while j < len(p):
+                            if allNullable(p, i + 1, j):
+                                old = len(follow.setdefault(p[i], set()))
+                                follow[p[i]] |= first.setdefault(p[j], set())
+                                if old != len(follow[p[i]]):
+                                    flag = True
+                            j += 1
+                        i += 1
+
+                if first_old_size != len(first[x]) or nullable_old_value != nullable[x]:
+                    flag = True
+
+        # the entry of the char after the end of a production, lab2.cc prints it as a blank line
+        follow.pop("\0", None)
+        for x in first.values():
+            x.discard(LLAnalyzer.Epsilon)
+        for x in follow.values():
+            x.discard(LLAnalyzer.Epsilon)
+        return (first, follow, nullable)
+
+    @staticmethod
+    def firstSetOfSentence(s:str, first:dict, nullable:dict) -> set:
+        ret = set()
+        for x in s:
+            ret |= first[x]
+            if not nullable[x]:
+                break
+        return ret
+
+    @staticmethod
+    def checkLL(symbols:dict, first:dict, follow:dict, nullable:dict) -> bool:
+        for x in sorted(symbols):
+            candidates = symbols[x]
+            if candidates == None:
+                continue
+            if nullable[x] and len(first[x] & follow[x]) != 0:
+                return False
+            i = 0
+            while i < len(candidates):
+                s1 = LLAnalyzer.firstSetOfSentence(candidates[i], first, nullable)
+                j = i + 1
+                while j < len(candidates):
+                    if len(s1 & LLAnalyzer.firstSetOfSentence(candidates[j], first, nullable)) != 0:
+                        return False
+                    j += 1
+                i += 1
+        return True
+
+    # like lab2.cc only the first symbol of a candidate is looked at, a later candidate
+    # overwrites an earlier one in the same cell
+    @staticmethod
+    def predictTableGen(symbols:dict, first:dict, follow:dict, nullable:dict) -> dict:
+        table = {}
+        for x in sorted(symbols):
+            if symbols[x] == None:
+                continue
+            row = {}
+            table[x] = row
+            if nullable[x]:
+                row[LLAnalyzer.Guard] = LLAnalyzer.Epsilon
+            for s in symbols[x]:
+                for c in first[s[0]]:
+                    row[c] = s
+                if nullable[s[0]]:
+                    for c in follow[x]:
+                        row[c] = s
+        return table
+
+    # the rows lab2.cc prints, (symbol stack, input, action). The input column is the
+    # input at the last GETNEXT(), as lab2.cc prints it
+    def predictiveAnalysis(self, sentence:str) -> list:
+        steps = []
+        stack = [LLAnalyzer.Guard, self.start]
+        input_str = sentence + LLAnalyzer.Guard
+        input_pos = 0
+        last_stack = sentence
+        last_input_pos = 0
+        # nonterminal -> stack size when it was expanded, since the last GETNEXT(). If it is
+        # on top again and the stack below it was not touched, the expansions repeat forever,
+        # lab2.cc never stops there
+        expanded = {}
+        while len(stack) != 0 and input_pos != len(input_str):
+            c = input_str[input_pos]
+            if c == stack[-1]:
+                last_stack = "".join(stack)
+                stack.pop()
+                last_input_pos = input_pos
+                input_pos += 1
+                steps.append((last_stack, input_str[last_input_pos:], "GETNEXT()"))
+                expanded.clear()
+                continue
+
+            row = self.table.get(stack[-1])
+            if row == None or c not in row:
+                steps.append(("ERROR", "Not Found in Predictive Table", stack[-1] + ", " + c))
+                return steps
+            if expanded.get(stack[-1], len(stack) + 1) <= len(stack):
+                steps.append(("ERROR", "Endless Expansion in Predictive Table", stack[-1] + ", " + c))
+                return steps
+            expanded[stack[-1]] = len(stack)
+            p = row[c]
+            action = stack[-1] + "->" + p
+            last_stack = "".join(stack)
+            stack.pop()
+            for x in [x for x in expanded if expanded[x] - 1 > len(stack)]:
+                del expanded[x]
+            if p[0] != LLAnalyzer.Epsilon:
+                stack.extend(reversed(p))
+            steps.append((last_stack, input_str[last_input_pos:], action))
+
+        if len(stack) != 0:
+            steps.append(("ERROR", "Symbol Stack not Empty", "Input String is empty"))
+        if input_pos != len(input_str):
+            steps.append(("ERROR", "Symbol Stack is empty", "Input String not empty"))
+        return steps
+
+    def productions(self) -> list:
+        return [(x, self.symbols[x]) for x in sorted(self.symbols) if self.symbols[x] != None]
+
+    def analyze(self, sentence:str) -> LLResult:
+        return LLResult(self.check, self.productions(), self.first, self.follow, self.nullable,
+                        self.table, self.predictiveAnalysis(sentence))
+
+
+# read stdin like lab2.cc, the production count, the productions and the sentence,
+# and print what it prints, lab2.py [--json]
+def main(argv:list) -> int:
+    words = sys.stdin.read().split()
+    n = int(words[0])
+    productions = words[1:1 + n]
+    sentence = words[1 + n] if len(words) > 1 + n else ""
+    try:
+        lla = LLAnalyzer(productions)
+    except ValueError as e:
+        sys.stderr.write(str(e) + "\n")
+        return 1
+    result = lla.analyze(sentence)
+    if len(argv) > 0 and argv[0] == "--json":
+        sys.stdout.write(result.toJson())
+    else:
+        sys.stdout.write(result.toText())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -6,116 +6,52 @@ from PySide2.QtWidgets import QApplication, QHeaderView, QWidget, QLabel, QTable
 from PySide2.QtWidgets import QListWidget, QListWidgetItem, QMessageBox
 from PySide2.QtCore import QFile, QIODevice, QSize
 import subprocess
+from lab2 import LLAnalyzer, LLResult
 
 
 
 
 
-def parseTheOutput(output_str):
-    
-    def parseCheck(opstr):
-        che_start = "CHECK_START#"
-        che_end = "CHECK_END#"
-        start_index = opstr.index(che_start)
-        end_index = opstr.index(che_end)
-        return opstr[start_index+1] == "1"
-    def parseProduction(opstr):
-        pro_start = "PRODUCTIONS_START#"
-        pro_end = "PRODUCTIONS_END#"
-        start_index = opstr.index(pro_start)
-        end_index = opstr.index(pro_end)
-        i = start_index + 1
-        productions = []
-        while(i != end_index):
-            productions = productions + [opstr[i]]
-            i = i + 1
-        return productions
-
-
-    def parseFirst(opstr):
-        fst_start = "FIRST_START#"
-        fst_end = "FIRST_END#"
-        start_index = opstr.index(fst_start)
-        end_index = opstr.index(fst_end)
-        i = start_index + 1
-        first = {}
-        while(i != end_index):
-            tmp = opstr[i].split(":")
-            if(len(tmp) == 2):
-                first[tmp[0]] = tmp[1][:-1]
-            i = i + 1
-        return first
-    
-    def parseFollow(opstr):
-        fol_start = "FOLLOW_START#"
-        fol_end = "FOLLOW_END#"
-        start_index = opstr.index(fol_start)
-        end_index = opstr.index(fol_end)
-        i = start_index + 1
-        follow = {}
-        while(i != end_index):
-            tmp = opstr[i].split(":")
-            if(len(tmp) == 2 and tmp[0] != "\0"):
-                follow[tmp[0]] = tmp[1][:-1]
-            i = i + 1
-        return follow
-    
-    def parseNul(opstr):
-        nul_start = "NULLABLE_START#"
-        nul_end = "NULLABLE_END#"
-        start_index = opstr.index(nul_start)
-        end_index = opstr.index(nul_end)
-        i = start_index + 1
-        nullable = {}
-        while(i != end_index):
-            tmp = opstr[i].split(":")
-            if(len(tmp) == 2):
-                nullable[tmp[0]] = tmp[1]
-            i = i + 1
-        return nullable 
+# the LLResult of the document lab2 --json writes, decoded while the backend writes it
+def decodeBackendOutput(stream) -> LLResult:
+    try:
+        return LLResult.readJson(stream)
+    except ValueError:
+        raise ValueError("lab2 wrote no result, check the grammar")
 
-    
-    def parseTab(opstr):
-        tab_start = "TABLE_START#"
-        tab_end = "TABLE_END#"
-        start_index = opstr.index(tab_start)
-        end_index = opstr.index(tab_end)
-        i = start_index + 1
-        table = []
-        while(i != end_index):
-            table = table + [opstr[i]]
-            i = i + 1
-        return table
 
-    
-    def parseProcess(opstr):
-        proc_start = "PROCESS_START#"
-        proc_end = "PROCESS_END#"
-        start_index = opstr.index(proc_start)
-        end_index = opstr.index(proc_end)
-        i = start_index + 1
-        stack = []
-        input_str = []
-        accord_action = []
-        while(i != end_index):
-            three_str = opstr[i].strip().split("\t")
-            stack = stack + [three_str[0]]
-            input_str = input_str + [three_str[1]]
-            accord_action = accord_action + [three_str[2]]
-            i = i + 1
-        return (stack, input_str, accord_action)
-
-    tmp_lines = output_str.split("\n")
+# run the lab2 binary at path instead of LLAnalyzer
+def runBackend(path:str, productions:list, sentence:str) -> LLResult:
+    backend_stdin = "{}\n{}\n{}".format(len(productions), "\n".join(productions), sentence)
+    proc = subprocess.Popen([path, "--json"], stdout=subprocess.PIPE, stdin=subprocess.PIPE)
+    proc.stdin.write(backend_stdin.encode())
+    proc.stdin.close()
+    # read before waiting, a big process trace fills the pipe otherwise
+    try:
+        return decodeBackendOutput(proc.stdout)
+    finally:
+        proc.stdout.close()
+        proc.wait()
 
-    
 
-    return (parseProduction(tmp_lines)
-    ,parseFirst(tmp_lines)
-    ,parseFollow(tmp_lines)
-    ,parseNul(tmp_lines)
-    ,parseTab(tmp_lines)
-    ,parseProcess(tmp_lines)
-    ,parseCheck(tmp_lines))
+# the rows the tabs show, sets are joined with "," like lab2.cc prints them
+def resultTables(result):
+    fsts = {}
+    for x in sorted(result.first):
+        fsts[x] = ",".join(sorted(result.first[x]))
+    fols = {}
+    for x in sorted(result.follow):
+        fols[x] = ",".join(sorted(result.follow[x]))
+    nuls = {}
+    for x in sorted(result.nullable):
+        nuls[x] = str(int(result.nullable[x]))
+    tabs = []
+    for x in sorted(result.table):
+        for y in sorted(result.table[x]):
+            tabs.append("T({}, {}) = {} -> {}".format(x, y, x, result.table[x][y]))
+    procs = ([x[0] for x in result.process], [x[1] for x in result.process], [x[2] for x in result.process])
+    prods = [x + "->" + "|".join(y) for (x, y) in result.productions]
+    return (prods, fsts, fols, nuls, tabs, procs, result.check)
 
 
 
@@ -143,30 +79,38 @@ if __name__ == "__main__":
 
 
     
-    def llanalysis_clicked():
-        print("llanalysis_clicked")
+    # lab2gui.py --backend PATH runs the lab2 binary, like ../build/lab2/lab2
+    backend = None
+    if "--backend" in sys.argv[:-1]:
+        backend = sys.argv[sys.argv.index("--backend") + 1]
+
+    # (productions, LLAnalyzer) of the last grammar
+    analyzer = [None]
 
+    def llanalysis_clicked():
         raw_str = window.input_text_box.toPlainText().strip()
         raw_str = raw_str.replace(" ", "")
-        str_list = raw_str.split('\n')
-        backend_stdin = str(len(str_list)) + "\n"
-
-        for x in str_list:
-            backend_stdin = backend_stdin + x + "\n"
-
-        backend_stdin = backend_stdin + window.sentence_lineedit.text().strip()
-        proc = subprocess.Popen('../build/lab2/lab2',stdout=subprocess.PIPE, stdin=subprocess.PIPE)
-
-        print("###")
-        print(backend_stdin)
-        print("###")
-
-        proc.stdin.write(backend_stdin.encode())
-        proc.stdin.close()
-        proc.wait()
-        result = proc.stdout.read().decode()
-
-        (prods, fsts, fols, nuls, tabs, procs, check) = parseTheOutput(result)
+        str_list = [x for x in raw_str.split('\n') if x != ""]
+
+        sentence = window.sentence_lineedit.text().strip()
+        if backend != None:
+            try:
+                result = runBackend(backend, str_list, sentence)
+            except ValueError as e:
+                QMessageBox.warning(window, "Grammar Error", str(e))
+                return
+        else:
+            # the analysis of the grammar is kept, a new sentence only runs the parse
+            if analyzer[0] == None or analyzer[0][0] != str_list:
+                try:
+                    analyzer[0] = (str_list, LLAnalyzer(str_list))
+                except ValueError as e:
+                    analyzer[0] = None
+                    QMessageBox.warning(window, "Grammar Error", str(e))
+                    return
+            result = analyzer[0][1].analyze(sentence)
+
+        (prods, fsts, fols, nuls, tabs, procs, check) = resultTables(result)
 
         check_status = window.check_status
         if not check :
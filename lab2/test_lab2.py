@@ -0,0 +1,100 @@
+import io
+import json
+import os
+import unittest
+
+from lab2 import LLAnalyzer, LLResult
+
+testcase_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testcase")
+
+
+# a testcase file is the stdin of lab2.cc, returns (productions, sentence)
+def readCase(name:str) -> tuple:
+    f = open(os.path.join(testcase_dir, name), "r")
+    words = f.read().split()
+    f.close()
+    n = int(words[0])
+    return (words[1:1 + n], words[1 + n] if len(words) > 1 + n else "")
+
+
+class LLAnalyzerTest(unittest.TestCase):
+
+    # caseN.out is what lab2.cc prints for caseN.txt, without the FOLLOW line of the
+    # '\0' entry it keeps for the end of a production, which LLAnalyzer leaves out
+    def testCases(self):
+        for name in ["case1", "case2", "case3"]:
+            (productions, sentence) = readCase(name + ".txt")
+            f = open(os.path.join(testcase_dir, name + ".out"), "r")
+            expected = f.read()
+            f.close()
+            self.assertEqual(LLAnalyzer(productions).analyze(sentence).toText(), expected, name)
+
+    def testAccepted(self):
+        lla = LLAnalyzer(["E->E+T|T", "T->T*F|F", "F->(E)|i"])
+        self.assertTrue(lla.check)
+        self.assertTrue(lla.analyze("i*(i+i)").accepted())
+        self.assertFalse(lla.analyze("i+*i").accepted())
+
+    def testEmptyCandidate(self):
+        with self.assertRaises(ValueError):
+            LLAnalyzer(["E->a||b"])
+
+    def testAllLeftRecursive(self):
+        with self.assertRaises(ValueError):
+            LLAnalyzer(["E->Ea|Eb"])
+
+    # substituting A into A -> A comes back to A, lab2.cc never stops there
+    def testSubstitutionLoop(self):
+        with self.assertRaises(ValueError):
+            LLAnalyzer(["S->A", "A->A"])
+
+    # S -> S is in the table, expanding it never consumes the input
+    def testEndlessExpansion(self):
+        result = LLAnalyzer(["S->b|Sa|S"]).analyze("ba")
+        self.assertFalse(result.accepted())
+        self.assertEqual(result.process[-1][:2], ("ERROR", "Endless Expansion in Predictive Table"))
+
+
+class ReadJsonTest(unittest.TestCase):
+
+    def setUp(self):
+        (productions, sentence) = readCase("case2.txt")
+        self.result = LLAnalyzer(productions).analyze(sentence)
+        # a value longer than the chunks, and chars taking several bytes split by them
+        self.result.process.append(("ERROR", "é" * 100, "ü"))
+        self.data = self.result.toJson().encode("utf-8")
+
+    def assertSameResult(self, result:LLResult, doc:dict):
+        self.assertEqual(result.check, doc["check"])
+        self.assertEqual(result.productions, [(x, y) for (x, y) in doc["productions"]])
+        self.assertEqual(result.first, {x: set(y) for (x, y) in doc["first"].items()})
+        self.assertEqual(result.follow, {x: set(y) for (x, y) in doc["follow"].items()})
+        self.assertEqual(result.nullable, doc["nullable"])
+        self.assertEqual(result.table, doc["table"])
+        self.assertEqual(result.process, [tuple(x) for x in doc["process"]])
+
+    def testChunks(self):
+        doc = json.loads(self.data)
+        for chunk_size in [1, 2, 7, 65536]:
+            self.assertSameResult(LLResult.readJson(io.BytesIO(self.data), chunk_size), doc)
+
+    # lab2.cc writes a section or a row a line
+    def testLines(self):
+        data = self.data.replace(b", \"", b",\n\"").replace(b"], [", b"],\n[")
+        self.assertSameResult(LLResult.readJson(io.BytesIO(data), 3), json.loads(data))
+
+    def testTruncated(self):
+        for end in [0, 1, len(self.data) // 2, len(self.data) - 3]:
+            for chunk_size in [1, 7]:
+                with self.assertRaises(ValueError):
+                    LLResult.readJson(io.BytesIO(self.data[:end]), chunk_size)
+
+    def testBroken(self):
+        for data in [b"[]", b'{"check": tr', b'{"check": true', b'{"check" true}',
+                     b'{"check": true, "process": [["a", "b", "c"] ["x"]]}', b'{"check": true, "process": []}']:
+            with self.assertRaises(ValueError):
+                LLResult.readJson(io.BytesIO(data), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
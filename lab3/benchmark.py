@@ -0,0 +1,512 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from lab3 import FirstSets, LRAnalyzer, Production, Token, TokenTable
+
+testcase_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testcase")
+
+# name of a run -> its numbers, written by --save-baseline and compared by --baseline
+results = {}
+
+def record(name:str, metrics:dict):
+    results[name] = metrics
+
+
+# expression grammar with one nonterminal per precedence level,
+# E0 -> E0 op0 E1 | E1, ... , En -> ( E0 ) | id
+def exprGrammar(levels:int) -> list:
+    pstrs = []
+    i = 0
+    while i < levels:
+        pstrs.append("E{} -> E{} op{} E{} | E{}".format(i, i, i, i + 1, i + 1))
+        i = i + 1
+    pstrs.append("E{} -> ( E0 ) | id".format(levels))
+    return pstrs
+
+
+# N0 -> N1 t0 | N0 u0 | ?, ... , Nn -> tn, every FIRST set depends on the
+# next nonterminal, which a pass in production order only sees one pass later
+def chainGrammar(count:int) -> list:
+    pstrs = []
+    i = 0
+    while i < count:
+        pstrs.append("N{} -> N{} t{} | N{} u{} | ?".format(i, i + 1, i, i, i))
+        i = i + 1
+    pstrs.append("N{} -> t{}".format(count, count))
+    return pstrs
+
+
+# S -> t0 E u0 | ... | tn E un with an expression grammar E, LR(1) needs a copy
+# of the automaton of E for every ui following it, LALR(1) merges them into one
+def blowupGrammar(count:int) -> list:
+    alternatives = ["t{} E u{}".format(i, i) for i in range(count)]
+    return ["S -> " + " | ".join(alternatives),
+            "E -> E + F | F",
+            "F -> ( E ) | id"]
+
+
+# S -> S ; T | T, T -> k0 id | ... | kn id, the table widens with the terminals
+def terminalsGrammar(count:int) -> list:
+    alternatives = ["k{} id".format(i) for i in range(count)]
+    return ["S -> S ; T | T",
+            "T -> " + " | ".join(alternatives)]
+
+
+# functions, declarations, assignments, if/else, while, return and calls,
+# with the usual precedence levels of + - * / and comparisons
+def cSubsetGrammar() -> list:
+    return ["Program -> Program Func | Func",
+            "Func -> Type id ( Params ) Block",
+            "Type -> int | void",
+            "Params -> ParamList | ?",
+            "ParamList -> ParamList , Type id | Type id",
+            "Block -> { Stmts }",
+            "Stmts -> Stmts Stmt | ?",
+            "Stmt -> Type id ; | Type id = Expr ; | id = Expr ; | if ( Expr ) Block | if ( Expr ) Block else Block"
+            " | while ( Expr ) Block | return Expr ; | Expr ;",
+            "Expr -> Expr == Sum | Expr < Sum | Sum",
+            "Sum -> Sum + Term | Sum - Term | Term",
+            "Term -> Term * Factor | Term / Factor | Factor",
+            "Factor -> ( Expr ) | id | num | id ( Args )",
+            "Args -> ArgList | ?",
+            "ArgList -> ArgList , Expr | Expr"]
+
+
+# token values of one cSubsetGrammar function with about size tokens in its body
+def cSubsetTokens(size:int):
+    for x in "int id ( int id , int id ) {".split():
+        yield x
+    statements = ["id = id + num * ( id - num ) ;",
+                  "if ( id < num ) { id = id ( id , num ) ; } else { return id ; }",
+                  "while ( id == num ) { int id = id / num ; }"]
+    statements = [x.split() for x in statements]
+    count = 0
+    i = 0
+    while count < size:
+        for x in statements[i % len(statements)]:
+            yield x
+        count += len(statements[i % len(statements)])
+        i += 1
+    yield "}"
+
+
+def loadCase(name:str) -> list:
+    f = open(os.path.join(testcase_dir, name), "r")
+    pstrs = f.read().strip().split("\n")
+    f.close()
+    return pstrs
+
+
+def benchBuild(name:str, pstrs:list, repeat:int = 3, mode = LRAnalyzer.Mode.LR1):
+    best = None
+    lra = None
+    i = 0
+    while i < repeat:
+        start = time.perf_counter()
+        lra = LRAnalyzer(pstrs, "?", "START", "#", mode)
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best:
+            best = elapsed
+        i = i + 1
+    states = lra.stateCount()
+    items = sum([len(x) for x in lra.getClosures()])
+    raw_size = lra.compile().sizeInBytes()
+    compressed_size = lra.compress().sizeInBytes()
+    mode_str = ["LR(1)", "LALR(1)"][mode]
+    stats = lra.closure_stats
+    # one more build with tracemalloc for the peak, it is not timed
+    peak = LRAnalyzer(pstrs, "?", "START", "#", mode, profile = True).stats.peak_memory
+    print("{:<16} {:<8} productions: {:>4}  states: {:>6}  items: {:>7}  build: {:>9.4f}s  states/s: {:>10.1f}  table: {:>8}B -> {:>8}B  peak: {:>10}B  memo hits: kernel {}/{} expand {}/{}".format(
+        name, mode_str, len(pstrs), states, items, best, states / best, raw_size, compressed_size, peak,
+        stats["kernel_hits"], stats["kernel_hits"] + stats["kernel_misses"],
+        stats["expand_hits"], stats["expand_hits"] + stats["expand_misses"]))
+    record("build {} {}".format(name, mode_str), {"seconds" : best, "states" : states, "items" : items,
+                                                  "conflicts" : len(lra.conflict_list), "table_bytes" : raw_size,
+                                                  "compressed_bytes" : compressed_size, "peak_bytes" : peak})
+
+
+def benchFirstSets(counts:list):
+    for count in counts:
+        pstrs = chainGrammar(count)
+        ttab = TokenTable()
+        productions = {}
+        for x in pstrs:
+            prod = Production(x, ttab)
+            productions[prod.left] = prod
+        start = time.perf_counter()
+        first_sets = FirstSets(productions, ttab, Token("?", Token.TypeTerminal))
+        elapsed = time.perf_counter() - start
+        print("first   {:>8} nonterminals  |FIRST(N0)|: {:>8}  build: {:>9.4f}s".format(
+            count + 1, len(first_sets.queryFirst(ttab.getToken("N0"))), elapsed))
+        record("first chain{}".format(count), {"seconds" : elapsed})
+
+
+# build exprN, then edit the production of the last level, which every other level
+# reaches, and the one of the first level, which none of them reaches. Only the
+# closure contributions are reused, the closures phase is printed beside the total
+def benchIncremental(levels:int):
+    pstrs = exprGrammar(levels)
+    previous = LRAnalyzer(pstrs, "?", "START", "#")
+    edits = [("last", pstrs[:-1] + ["E{} -> ( E0 ) | id | num".format(levels)]),
+             ("first", ["E0 -> E0 op0 E1 | E1 op0 E0 | E1"] + pstrs[1:])]
+    for (name, edited) in edits:
+        start = time.perf_counter()
+        fresh = LRAnalyzer(edited, "?", "START", "#")
+        full = time.perf_counter() - start
+        start = time.perf_counter()
+        lra = LRAnalyzer(edited, "?", "START", "#", previous = previous)
+        incremental = time.perf_counter() - start
+        print("edit    expr{:<4} {:<6} full: {:>9.4f}s (closures {:>7.4f}s)  incremental: {:>9.4f}s (closures {:>7.4f}s)  reused: {:>4} of {:>4} closure contributions".format(
+            levels, name, full, fresh.stats.phase_seconds["closures"], incremental, lra.stats.phase_seconds["closures"],
+            lra.closure_stats["expand_reused"], len(lra.expand_memo)))
+        record("edit expr{} {}".format(levels, name), {"seconds" : incremental, "full_seconds" : full,
+                                                       "closures_seconds" : lra.stats.phase_seconds["closures"]})
+
+
+# build every bundled case with profile set, parse a sentence with analyze and write
+# the AnalyzerStats of every build to path as one JSON document, for comparing runs in CI
+def benchStats(path:str, levels:list):
+    grammars = []
+    for name in sorted(os.listdir(testcase_dir)):
+        if name.startswith("case") and name.endswith(".txt"):
+            grammars.append((name, loadCase(name), ""))
+    for n in levels:
+        grammars.append(("expr{}".format(n), exprGrammar(n), " ".join(["id op0"] * n + ["id"])))
+
+    out = {}
+    for mode in [LRAnalyzer.Mode.LR1, LRAnalyzer.Mode.LALR1]:
+        for (name, pstrs, sentence_str) in grammars:
+            lra = LRAnalyzer(pstrs, "?", "START", "#", mode, profile = True)
+            (status, sentence) = lra.getSentenceByStr(sentence_str)
+            if status and len(sentence) != 0:
+                lra.analyze(sentence, trace = lambda step : None)
+            out["{} {}".format(name, ["LR(1)", "LALR(1)"][mode])] = lra.stats.toDict()
+    f = open(path, "w")
+    json.dump(out, f, indent = 2, sort_keys = True)
+    f.close()
+    print("stats   {} builds written to {}".format(len(out), path))
+
+
+# parse ( ( ... int ... ) ) with case3.txt, the state stack grows with the depth,
+# time per token has to stay flat when the depth grows
+def benchNesting(depths:list):
+    lra = LRAnalyzer(loadCase("case3.txt"), "?", "START", "#")
+    lra.compile()
+    lparen = lra.ttab.getToken("(")
+    rparen = lra.ttab.getToken(")")
+    number = lra.ttab.getToken("int")
+    per_token = []
+    for depth in depths:
+        sentence = [lparen] * depth + [number] + [rparen] * depth
+        start = time.perf_counter()
+        status = lra.parse(sentence)
+        elapsed = time.perf_counter() - start
+        per_token.append(elapsed / len(sentence))
+        print("nesting {:>8}  tokens: {:>8}  accepted: {}  parse: {:>9.4f}s  ns/token: {:>8.1f}".format(
+            depth, len(sentence), status, elapsed, per_token[-1] * 1e9))
+        record("nesting {}".format(depth), {"seconds" : elapsed, "tokens_per_second" : len(sentence) / elapsed})
+    print("nesting ns/token ratio, deepest / shallowest: {:.2f}".format(per_token[-1] / per_token[0]))
+
+
+# the same sentences with the tracing drivers, analyze and analyzeWithResolver, which pop
+# their stacks in place too. Every step is a copy of both stacks and of the rest of the
+# sentence, so time per step grows with the depth by the size of the steps alone
+def benchNestingTrace(depths:list):
+    lra = LRAnalyzer(loadCase("case3.txt"), "?", "START", "#")
+    lparen = lra.ttab.getToken("(")
+    rparen = lra.ttab.getToken(")")
+    number = lra.ttab.getToken("int")
+    for (name, resolver) in [("analyze", None), ("resolver", lambda actions : 0)]:
+        per_step = []
+        for depth in depths:
+            sentence = [lparen] * depth + [number] + [rparen] * depth
+            steps = [0]
+            def countStep(step):
+                steps[0] += 1
+            start = time.perf_counter()
+            (status, _) = lra.analyze(sentence, resolver, trace = countStep)
+            elapsed = time.perf_counter() - start
+            per_step.append(elapsed / steps[0])
+            print("nesting {:>8}  {:<8} steps: {:>8}  accepted: {}  parse: {:>9.4f}s  ns/step: {:>8.1f}".format(
+                depth, name, steps[0], status, elapsed, per_step[-1] * 1e9))
+            record("nesting {} {}".format(name, depth), {"seconds" : elapsed, "steps_per_second" : steps[0] / elapsed})
+        print("nesting {} ns/step ratio, deepest / shallowest: {:.2f}  depth ratio: {:.2f}".format(
+            name, per_step[-1] / per_step[0], depths[-1] / depths[0]))
+
+
+# parse a generated file of case3.txt sentences with parseStream, peak memory
+# is measured in a second run with tracemalloc and has to stay flat with the size
+def benchStream(sizes:list):
+    lra = LRAnalyzer(loadCase("case3.txt"), "?", "START", "#")
+    lra.compile()
+    pattern = " + int * ( int + int )"
+    pattern_len = len(pattern.split())
+    for size in sizes:
+        f = tempfile.TemporaryFile("w+")
+        f.write("int")
+        i = 0
+        while i < size // pattern_len:
+            f.write(pattern)
+            i = i + 1
+        f.write("\n")
+        byte_count = f.tell()
+
+        f.seek(0)
+        start = time.perf_counter()
+        status = lra.parseStream(f)
+        elapsed = time.perf_counter() - start
+
+        f.seek(0)
+        tracemalloc.start()
+        lra.parseStream(f)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        f.close()
+
+        print("stream  {:>10} tokens  accepted: {}  parse: {:>9.4f}s  {:>7.2f} MB/s  {:>10.0f} tokens/s  peak: {:>8}B".format(
+            size, status, elapsed, byte_count / elapsed / 1e6, size / elapsed, peak))
+        record("stream {}".format(size), {"seconds" : elapsed, "tokens_per_second" : size / elapsed,
+                                          "mb_per_second" : byte_count / elapsed / 1e6, "peak_bytes" : peak})
+
+
+# parse a fixed batch of case3.txt sentences with parseBatch in 1, 2 and 4 worker
+# processes, the speedup is the sentence throughput against the single process,
+# the process pool startup is part of the time. The CPU time of this process and of
+# the workers is printed too, from it the speedup on as many cores as workers is
+# estimated: the single process CPU time over this process time plus a worker's share,
+# which is what the measured speedup approaches when there are enough cores
+def benchBatch(count:int, workers_list:list = [1, 2, 4]):
+    lra = LRAnalyzer(loadCase("case3.txt"), "?", "START", "#")
+    lra.compile()
+    patterns = ["int + int * ( int + int )", "( ( int ) ) * int", "int + * int", "int * ( int + ( int * int ) ) + int"]
+    lines = []
+    i = 0
+    while i < count:
+        lines.append(" + ".join([patterns[i % len(patterns)]] * (1 + i % 7)))
+        i = i + 1
+    single = None
+    single_cpu = None
+    for workers in workers_list:
+        times = os.times()
+        start = time.perf_counter()
+        first = None
+        accepted = 0
+        for (index, status) in lra.parseBatch(lines, workers):
+            if first == None:
+                first = time.perf_counter() - start
+            if status == LRAnalyzer.SentenceStatus.Accepted:
+                accepted += 1
+        elapsed = time.perf_counter() - start
+        end_times = os.times()
+        own_cpu = end_times.user + end_times.system - times.user - times.system
+        worker_cpu = max(0.0, end_times.children_user + end_times.children_system - times.children_user - times.children_system)
+        if single == None:
+            single = elapsed
+            single_cpu = own_cpu + worker_cpu
+        estimate = single_cpu / (own_cpu + worker_cpu / workers)
+        print("batch   {:>8} sentences  workers: {:>2}  accepted: {:>8}  parse: {:>9.4f}s  first: {:>7.4f}s  {:>10.0f} sentences/s  speedup: {:>5.2f}  cpu: {:>7.3f}s + workers {:>7.3f}s  estimated on {} cores: {:>5.2f}".format(
+            count, workers, accepted, elapsed, first, count / elapsed, single / elapsed, own_cpu, worker_cpu, workers, estimate))
+        record("batch {} workers {}".format(count, workers), {"seconds" : elapsed, "sentences_per_second" : count / elapsed,
+                                                              "first_seconds" : first, "cpu_seconds" : own_cpu,
+                                                              "worker_cpu_seconds" : worker_cpu})
+    print("batch   cpus: {}".format(os.cpu_count()))
+
+
+# parse a generated C subset function with parseStream from a token generator,
+# in both the full table and the compressed table
+def benchCSubset(sizes:list):
+    for compressed in [False, True]:
+        lra = LRAnalyzer(cSubsetGrammar(), "?", "START", "#", LRAnalyzer.Mode.LALR1)
+        if compressed:
+            lra.compress()
+        else:
+            lra.compile()
+        table_str = ["full", "compressed"][compressed]
+        for size in sizes:
+            start = time.perf_counter()
+            status = lra.parseStream(cSubsetTokens(size))
+            elapsed = time.perf_counter() - start
+
+            tracemalloc.start()
+            lra.parseStream(cSubsetTokens(size))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print("csubset {:>10} tokens  {:<10} accepted: {}  parse: {:>9.4f}s  {:>10.0f} tokens/s  peak: {:>8}B".format(
+                size, table_str, status, elapsed, size / elapsed, peak))
+            record("csubset {} {}".format(size, table_str), {"seconds" : elapsed, "tokens_per_second" : size / elapsed,
+                                                              "peak_bytes" : peak})
+
+
+# build the ParseTree of a generated C subset function, and evaluate it with semantic
+# actions counting the statements, against the plain accept/reject parse
+def benchTree(sizes:list):
+    lra = LRAnalyzer(cSubsetGrammar(), "?", "START", "#", LRAnalyzer.Mode.LALR1)
+    lra.compile()
+    actions = {"Stmts -> Stmts Stmt" : lambda stmts, stmt : stmts + 1, "Stmts -> ?" : lambda : 0,
+               "Block -> { Stmts }" : lambda l, stmts, r : stmts}
+    for size in sizes:
+        tokens = list(cSubsetTokens(size))
+        start = time.perf_counter()
+        lra.parseStream(tokens)
+        parse_time = time.perf_counter() - start
+        start = time.perf_counter()
+        tree = lra.parseTree(tokens)
+        tree_time = time.perf_counter() - start
+        start = time.perf_counter()
+        (status, value) = lra.evaluate(tokens, actions)
+        evaluate_time = time.perf_counter() - start
+        print("tree    {:>10} tokens  nodes: {:>9}  {:>5.1f}B/token  parse: {:>8.4f}s  tree: {:>8.4f}s  evaluate: {:>8.4f}s".format(
+            len(tokens), tree.nodeCount(), tree.sizeInBytes() / len(tokens), parse_time, tree_time, evaluate_time))
+        record("tree {}".format(size), {"seconds" : tree_time, "evaluate_seconds" : evaluate_time,
+                                        "tree_bytes" : tree.sizeInBytes()})
+
+
+# time from importing lab3 in a fresh interpreter to the end of the first parse of a
+# case3.txt sentence and of a cSubsetGrammar function, cold builds the table and warm
+# maps it from a filled TableCache. The time is split into the import, the analyzer
+# (build or cache load) and the first parse. Bytecode is written to a temporary
+# prefix, so only the first run compiles lab3.py, as in an installed copy
+def benchStartup(repeat:int = 5):
+    lab3_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPYCACHEPREFIX"] = tempfile.mkdtemp()
+    grammar_path = os.path.join(tempfile.mkdtemp(), "csubset.txt")
+    f = open(grammar_path, "w")
+    f.write("\n".join(cSubsetGrammar()))
+    f.close()
+    grammars = [("case3", os.path.join(testcase_dir, "case3.txt"), "int + int * ( int )"),
+                ("csubset", grammar_path, " ".join(cSubsetTokens(100)))]
+    for (grammar, path, sentence) in grammars:
+        cache_dir = tempfile.mkdtemp()
+        code = "\n".join([
+            "import time",
+            "start = time.perf_counter()",
+            "import lab3",
+            "imported = time.perf_counter()",
+            "cache = lab3.TableCache({!r}, mapped = True)".format(cache_dir),
+            "pstrs = open({!r}).read().strip().split('\\n')".format(path),
+            "lra = lab3.LRAnalyzer(pstrs, '?', 'START', '#', lab3.LRAnalyzer.Mode.LALR1, table_cache = cache)",
+            "built = time.perf_counter()",
+            "assert lra.parseStream(iter({!r}.split()))".format(sentence),
+            "end = time.perf_counter()",
+            "print(imported - start, built - imported, end - built)",
+            "print(int('PySide2' in __import__('sys').modules))"])
+        for name in ["cold", "warm"]:
+            best = None
+            i = 0
+            while i < repeat:
+                if name == "cold":
+                    for x in os.listdir(cache_dir):
+                        os.remove(os.path.join(cache_dir, x))
+                out = subprocess.run([sys.executable, "-c", code], cwd = lab3_dir, capture_output = True,
+                                     text = True, check = True, env = env).stdout.split()
+                times = [float(x) for x in out[:3]]
+                if best == None or sum(times) < sum(best):
+                    best = times
+                i = i + 1
+            print("startup {:<8} {:<6} import to first parse: {:>8.2f}ms  import: {:>7.2f}ms  analyzer: {:>7.2f}ms  parse: {:>7.2f}ms  Qt imported: {}".format(
+                grammar, name, sum(best) * 1e3, best[0] * 1e3, best[1] * 1e3, best[2] * 1e3, out[3] == "1"))
+            record("startup {} {}".format(grammar, name), {"seconds" : sum(best), "import_seconds" : best[0],
+                                                           "analyzer_seconds" : best[1]})
+
+
+# compare results with a baseline written by --save-baseline, times are ratios
+# new / old, a ratio over threshold is reported as a regression
+def compareBaseline(path:str, threshold:float) -> int:
+    f = open(path, "r")
+    baseline = json.load(f)
+    f.close()
+    regressions = 0
+    for name in sorted(results):
+        if not name in baseline:
+            continue
+        for (metric, value) in sorted(results[name].items()):
+            old = baseline[name].get(metric)
+            if old == None or old == 0 or not isinstance(value, (int, float)):
+                continue
+            ratio = value / old
+            # throughputs regress when they go down
+            if metric.endswith("_per_second"):
+                worse = ratio < 1 / threshold
+            else:
+                worse = ratio > threshold
+            if worse:
+                regressions += 1
+            if worse or metric == "seconds":
+                print("compare {:<36} {:<18} {:>12.6g} -> {:>12.6g}  x{:>6.2f}{}".format(
+                    name, metric, old, value, ratio, "  REGRESSION" if worse else ""))
+    print("compare {} regressions against {}".format(regressions, path))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "benchmark of the LR(1) table generator and the parser driver")
+    parser.add_argument("levels", type = int, nargs = "*", default = [4, 8, 16], help = "sizes of the exprN grammars")
+    parser.add_argument("--quick", action = "store_true", help = "small inputs only, for CI")
+    parser.add_argument("--stats", help = "write the AnalyzerStats of the bundled builds as JSON")
+    parser.add_argument("--save-baseline", help = "write the results as JSON")
+    parser.add_argument("--baseline", help = "compare the results with a file written by --save-baseline")
+    parser.add_argument("--threshold", type = float, default = 1.25, help = "slowdown ratio reported as a regression")
+    args = parser.parse_args()
+    levels = args.levels
+
+    if args.stats != None:
+        benchStats(args.stats, levels)
+
+    if args.quick:
+        blowups = [4, 16]
+        terminal_counts = [16, 128]
+        first_counts = [1000]
+        depths = [1000, 100000]
+        trace_depths = [250, 1000]
+        batch_count = 20000
+        stream_sizes = [100000]
+        csubset_sizes = [10000, 100000]
+    else:
+        blowups = [4, 16, 64]
+        terminal_counts = [16, 128, 1024]
+        first_counts = [1000, 4000]
+        depths = [1000, 10000, 100000, 1000000]
+        trace_depths = [250, 1000, 4000]
+        batch_count = 200000
+        stream_sizes = [100000, 1000000]
+        csubset_sizes = [10000, 100000, 1000000, 4000000]
+
+    for mode in [LRAnalyzer.Mode.LR1, LRAnalyzer.Mode.LALR1]:
+        for name in sorted(os.listdir(testcase_dir)):
+            if name.startswith("case") and name.endswith(".txt"):
+                benchBuild(name, loadCase(name), 3, mode)
+
+        for n in levels:
+            benchBuild("expr{}".format(n), exprGrammar(n), 1, mode)
+        for n in blowups:
+            benchBuild("blowup{}".format(n), blowupGrammar(n), 1, mode)
+        for n in terminal_counts:
+            benchBuild("terminals{}".format(n), terminalsGrammar(n), 1, mode)
+        benchBuild("csubset", cSubsetGrammar(), 1, mode)
+
+    benchIncremental(levels[-1])
+    benchFirstSets(first_counts)
+    benchNesting(depths)
+    benchNestingTrace(trace_depths)
+    benchStream(stream_sizes)
+    benchBatch(batch_count)
+    benchCSubset(csubset_sizes)
+    benchTree(csubset_sizes[:-1])
+    benchStartup()
+
+    if args.save_baseline != None:
+        f = open(args.save_baseline, "w")
+        json.dump(results, f, indent = 2, sort_keys = True)
+        f.close()
+        print("baseline written to {}".format(args.save_baseline))
+    if args.baseline != None and compareBaseline(args.baseline, args.threshold) != 0:
+        sys.exit(1)
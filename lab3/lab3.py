@@ -1,12 +1,13 @@
+import collections
+import itertools
+import mmap
+import os
+import struct
 import sys
+import time
+from array import array
 from copy import copy
 
-from PySide2.QtCore import *
-from PySide2.QtGui import QPixmap
-from PySide2.QtWidgets import *
-from PySide2.QtUiTools import *
-from graphviz import Digraph
-
 class Token:
     '''Token is represented as a string internally'''
     TypeTerminal = 0
@@ -145,12 +146,64 @@ class Production:
     def __repr__(self) -> str:
         return self.__str__()
 
+# split yacc style precedence declarations off the productions, a line
+# "%left + -", "%right ^" or "%nonassoc <" declares terminals of one level, later lines
+# bind tighter. An alternative ending with "%prec t" takes the precedence of t.
+# returns (production lines without %prec, list of (assoc, list of terminal strs),
+# dict of (left str, tuple of right strs) -> terminal str of %prec)
+def readDeclarations(pstr:list) -> tuple:
+    lines = []
+    declarations = []
+    prec_tokens = {}
+    for line in pstr:
+        parts = line.split()
+        if len(parts) != 0 and parts[0] in ["%left", "%right", "%nonassoc"]:
+            declarations.append((parts[0][1:], parts[1:]))
+            continue
+        if "%prec" in parts:
+            arrow_index = line.find("->")
+            left = line[:arrow_index].strip()
+            rights = []
+            for x in line[arrow_index + 2:].split("|"):
+                words = x.split()
+                if len(words) >= 2 and words[-2] == "%prec":
+                    prec_tokens[(left, tuple(words[:-2]))] = words[-1]
+                    words = words[:-2]
+                rights.append(" ".join(words))
+            line = line[:arrow_index] + "-> " + " | ".join(rights)
+        lines.append(line)
+    return (lines, declarations, prec_tokens)
+
+
 class Item:
-    def __init__(self, left_token, right_tokens, pos, preview_token):
+    '''Item is immutable, it is hashed and compared by (production id, pos, preview tokens).
+    The preview tokens are a bitset, bit i stands for terminals[i].'''
+    __slots__ = ("prod_id", "left_token", "right_tokens", "pos", "lookaheads", "terminals", "key", "_hash")
+
+    def __init__(self, prod_id:int, left_token, right_tokens:tuple, pos:int, lookaheads:int, terminals:list):
+        self.prod_id = prod_id
         self.left_token = left_token
         self.pos = pos
         self.right_tokens = right_tokens
-        self.preview_token = preview_token
+        self.lookaheads = lookaheads
+        self.terminals = terminals
+        self.key = (prod_id, pos, lookaheads)
+        self._hash = hash(self.key)
+
+    # used to calculate GO(...) function, returns a new item with the dot moved right
+    def advance(self):
+        return Item(self.prod_id, self.left_token, self.right_tokens, self.pos + 1, self.lookaheads, self.terminals)
+
+    def previewTokens(self) -> list:
+        ret = []
+        bits = self.lookaheads
+        i = 0
+        while bits != 0:
+            if bits & 1:
+                ret.append(self.terminals[i])
+            bits >>= 1
+            i += 1
+        return ret
     
     # used to calculate closure
     def closureExtendable(self) -> bool:
@@ -179,19 +232,19 @@ class Item:
                 i = i + 1
         if once_flag:
             outstr = outstr[:-1] + " •"
-        outstr += ", {} ]".format(self.preview_token.val)
+        outstr += ", {} ]".format("/".join([x.val for x in self.previewTokens()]))
         return outstr
 
     def __repr__(self) -> str:
         return self.__str__()
     
     def __hash__(self) -> int:
-        return hash(self.__str__())
+        return self._hash
     
     def __eq__(self, o: object) -> bool:
         if not isinstance(o, Item):
             raise TypeError("compare different types")
-        return self.__repr__() == o.__repr__()
+        return self.key == o.key
     
 
 class FirstSets:
@@ -216,31 +269,72 @@ class FirstSets:
         self.first_sets[eplision] = set()
 
 
-        changed_in_this_iter = True
-        while(changed_in_this_iter):
-            changed_in_this_iter = False
+        # every alternative as (left token, right tokens)
+        alternatives = []
+        for prod in productions:
+            left_token = ttab.getToken(productions[prod].left)
+            for candi_strs in productions[prod].rights:
+                alternatives.append((left_token, [ttab.getToken(x) for x in candi_strs]))
 
-            for prod in productions:
-                for candi_strs in productions[prod].rights:
-
-                    left_token = ttab.getToken(productions[prod].left)
-                    old_len = len(self.first_sets[left_token])
-                    old_nullable = self.nullable[left_token]
-                    
-                    candi_tokens = [ttab.getToken(x) for x in candi_strs]
-
-                    i = 0
-                    while i < len(candi_tokens) and self.nullable[candi_tokens[i]]:
-                        self.first_sets[left_token] = self.first_sets[left_token].union(self.first_sets[candi_tokens[i]])
-                        i = i + 1
+        # nullable, every alternative counts its symbols not known to be nullable,
+        # when a symbol becomes nullable the alternatives it occurs in count down
+        remaining = []
+        occurrences = {}
+        worklist = []
+        i = 0
+        while i < len(alternatives):
+            (left_token, candi_tokens) = alternatives[i]
+            cnt = 0
+            for x in candi_tokens:
+                if not self.nullable[x]:
+                    cnt += 1
+                    if not x in occurrences:
+                        occurrences[x] = []
+                    occurrences[x].append(i)
+            remaining.append(cnt)
+            if cnt == 0 and not self.nullable[left_token]:
+                self.nullable[left_token] = True
+                worklist.append(left_token)
+            i = i + 1
 
-                    if i < len(candi_tokens):
-                        self.first_sets[left_token] = self.first_sets[left_token].union(self.first_sets[candi_tokens[i]])
-                    else:
-                        self.nullable[left_token] = True
-                    
-                    if old_len != len(self.first_sets[left_token]) or old_nullable != self.nullable[left_token]:
-                        changed_in_this_iter = True
+        while len(worklist) != 0:
+            token = worklist.pop()
+            for i in occurrences.get(token, []):
+                remaining[i] -= 1
+                left_token = alternatives[i][0]
+                if remaining[i] == 0 and not self.nullable[left_token]:
+                    self.nullable[left_token] = True
+                    worklist.append(left_token)
+
+        # FIRST, terminals of the nullable prefix are added directly, a nonterminal
+        # Y there gives an edge Y -> left, FIRST(left) includes FIRST(Y)
+        successors = {}
+        for (left_token, candi_tokens) in alternatives:
+            for x in candi_tokens:
+                if x.isNonTerminal():
+                    if x != left_token:
+                        if not x in successors:
+                            successors[x] = set()
+                        successors[x].add(left_token)
+                else:
+                    self.first_sets[left_token].update(self.first_sets[x])
+                if not self.nullable[x]:
+                    break
+
+        # propagate along the edges, only the nonterminals whose set grew are visited again
+        worklist = [x for x in successors if len(self.first_sets[x]) != 0]
+        in_worklist = set(worklist)
+        while len(worklist) != 0:
+            token = worklist.pop()
+            in_worklist.remove(token)
+            first = self.first_sets[token]
+            for succ in successors.get(token, []):
+                succ_first = self.first_sets[succ]
+                old_len = len(succ_first)
+                succ_first.update(first)
+                if len(succ_first) != old_len and not succ in in_worklist:
+                    in_worklist.add(succ)
+                    worklist.append(succ)
 
         for x in self.first_sets:
             if eplision in self.first_sets[x]:
@@ -259,10 +353,20 @@ class FirstSets:
         else:
             raise ValueError("queryNullable not found")
     
+    # FIRST sets as bitsets, bit i stands for the token of id i in terminal_index
+    def firstBits(self, terminal_index:dict) -> dict:
+        ret = {}
+        for token in self.first_sets:
+            bits = 0
+            for x in self.first_sets[token]:
+                bits |= 1 << terminal_index[x]
+            ret[token] = bits
+        return ret
+
     def queryFirstOfSentence(self, tokens):
         ret = set()
         for x in tokens:
-            ret = ret.union(self.queryFirst(x))
+            ret.update(self.queryFirst(x))
             if not self.queryNullable(x):
                 break
         return ret
@@ -271,21 +375,795 @@ class FirstSets:
         return str(self.first_sets) + str(self.nullable)
 
 
+class ParseTable:
+    '''ACTION and GOTO packed into flat integer arrays indexed by state * width + token id.
+    An ACTION value of 0 is an error, v > 0 shifts to state v - 1 and v < 0 reduces by
+    production -v - 1. Production 0 is the argumented one, so -1 means accept.'''
+    Error = 0
+    Accept = -1
+
+    def __init__(self, state_count:int, terminals:list, nonterminals:list, prod_lhs:list, prod_len:list, guard_id:int):
+        self.state_count = state_count
+        # terminal id of the guard token, appended to every sentence
+        self.guard_id = guard_id
+
+        # token id -> token value, and token value -> token id
+        self.terminals = terminals
+        self.nonterminals = nonterminals
+        self.term_ids = {}
+        for x in terminals:
+            self.term_ids[x] = len(self.term_ids)
+        self.nonterm_ids = {}
+        for x in nonterminals:
+            self.nonterm_ids[x] = len(self.nonterm_ids)
+
+        self.action_width = len(terminals)
+        self.goto_width = len(nonterminals)
+        self.action = array("i", [ParseTable.Error]) * (state_count * self.action_width)
+        self.goto = array("i", [-1]) * (state_count * self.goto_width)
+
+        # nonterminal id of the left side and the length of the right side, by production id
+        self.prod_lhs = array("i", prod_lhs)
+        self.prod_len = array("i", prod_len)
+
+    @staticmethod
+    def shiftValue(state:int) -> int:
+        return state + 1
+
+    @staticmethod
+    def reduceValue(prod_id:int) -> int:
+        return -prod_id - 1
+
+    def getAction(self, state:int, term_id:int) -> int:
+        return self.action[state * self.action_width + term_id]
+
+    def getGoto(self, state:int, nonterm_id:int) -> int:
+        return self.goto[state * self.goto_width + nonterm_id]
+
+    # returns the token ids of the sentence, or None if a token is not a terminal
+    def getTokenIds(self, sentence:list):
+        ret = []
+        term_ids = self.term_ids
+        for x in sentence:
+            tid = term_ids.get(x.val)
+            if tid is None:
+                return None
+            ret.append(tid)
+        return ret
+
+    def sizeInBytes(self) -> int:
+        ret = 0
+        for x in [self.action, self.goto, self.prod_lhs, self.prod_len]:
+            ret += x.itemsize * len(x)
+        return ret
+
+    # binary layout, every number is a little endian int32:
+    # header (magic, version, state_count, terminal count, nonterminal count,
+    # production count, guard id, names length), names (terminals then nonterminals
+    # joined by "\n", padded to 4 bytes), action, goto, prod_lhs, prod_len
+    # every array starts 4 byte aligned, so the file can be mapped as it is
+    Magic = b"LRPT"
+    Version = 2
+    HeaderFormat = "<4sIIIIIiI"
+
+    def toBytes(self) -> bytes:
+        names = "\n".join(self.terminals + self.nonterminals).encode("utf-8")
+        names += b"\0" * (-len(names) % 4)
+        out = [struct.pack(ParseTable.HeaderFormat, ParseTable.Magic, ParseTable.Version, self.state_count,
+                           len(self.terminals), len(self.nonterminals), len(self.prod_lhs), self.guard_id,
+                           len(names)), names]
+        for x in [self.action, self.goto, self.prod_lhs, self.prod_len]:
+            if sys.byteorder == "big":
+                x = array("i", x)
+                x.byteswap()
+            out.append(x.tobytes())
+        return b"".join(out)
+
+    def save(self, path:str):
+        tmp_path = path + ".{}.tmp".format(os.getpid())
+        f = open(tmp_path, "wb")
+        f.write(self.toBytes())
+        f.close()
+        os.replace(tmp_path, path)
+
+    # returns (state_count, terminals, nonterminals, production count, guard id,
+    # offset of the arrays, offset of the end), or None if it is not a table of this version
+    @staticmethod
+    def readHeader(data, offset:int = 0):
+        header_len = struct.calcsize(ParseTable.HeaderFormat)
+        if len(data) < offset + header_len:
+            return None
+        (magic, version, state_count, term_count, nonterm_count, prod_count, guard_id, names_len) = \
+            struct.unpack_from(ParseTable.HeaderFormat, data, offset)
+        if magic != ParseTable.Magic or version != ParseTable.Version:
+            return None
+        pos = offset + header_len
+        names = bytes(data[pos:pos + names_len]).rstrip(b"\0").decode("utf-8").split("\n")
+        if len(names) != term_count + nonterm_count:
+            return None
+        pos += names_len
+        end = pos + 4 * (state_count * (term_count + nonterm_count) + 2 * prod_count)
+        if len(data) < end:
+            return None
+        return (state_count, names[:term_count], names[term_count:], prod_count, guard_id, pos, end)
+
+    # returns the table, or None if data is not a table of this version
+    @staticmethod
+    def fromBytes(data:bytes):
+        header = ParseTable.readHeader(data)
+        if header == None:
+            return None
+        (state_count, terminals, nonterminals, prod_count, guard_id, pos, end) = header
+        if end != len(data):
+            return None
+
+        def readArray(n:int) -> array:
+            nonlocal pos
+            ret = array("i")
+            ret.frombytes(data[pos:pos + 4 * n])
+            if sys.byteorder == "big":
+                ret.byteswap()
+            pos += 4 * n
+            return ret
+
+        table = ParseTable(state_count, terminals, nonterminals, [], [], guard_id)
+        table.action = readArray(state_count * len(terminals))
+        table.goto = readArray(state_count * len(nonterminals))
+        table.prod_lhs = readArray(prod_count)
+        table.prod_len = readArray(prod_count)
+        return table
+
+
+class MappedParseTable:
+    '''A ParseTable file opened with mmap, in the layout of ParseTable.toBytes().
+    The arrays are memoryviews over the mapped pages instead of copies, so every
+    process opening the same file shares one physical copy of the table.'''
+
+    def __init__(self, path:str, offset:int = 0):
+        if sys.byteorder == "big":
+            raise ValueError("MappedParseTable needs a little endian host")
+        self.path = path
+        self.offset = offset
+        f = open(path, "rb")
+        self.mm = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+        f.close()
+
+        header = ParseTable.readHeader(self.mm, offset)
+        if header == None:
+            self.mm.close()
+            raise ValueError("{} is not a parse table of version {}".format(path, ParseTable.Version))
+        (self.state_count, self.terminals, self.nonterminals, prod_count, self.guard_id, pos, end) = header
+
+        self.term_ids = {}
+        for x in self.terminals:
+            self.term_ids[x] = len(self.term_ids)
+        self.nonterm_ids = {}
+        for x in self.nonterminals:
+            self.nonterm_ids[x] = len(self.nonterm_ids)
+        self.action_width = len(self.terminals)
+        self.goto_width = len(self.nonterminals)
+
+        self.view = memoryview(self.mm)
+
+        def viewArray(n:int) -> memoryview:
+            nonlocal pos
+            ret = self.view[pos:pos + 4 * n].cast("i")
+            pos += 4 * n
+            return ret
+
+        self.action = viewArray(self.state_count * self.action_width)
+        self.goto = viewArray(self.state_count * self.goto_width)
+        self.prod_lhs = viewArray(prod_count)
+        self.prod_len = viewArray(prod_count)
+
+    getAction = ParseTable.getAction
+    getGoto = ParseTable.getGoto
+    getTokenIds = ParseTable.getTokenIds
+
+    # mapped pages are shared, only the token maps are owned by this process
+    def sizeInBytes(self) -> int:
+        return 0
+
+    def close(self):
+        for x in [self.action, self.goto, self.prod_lhs, self.prod_len, self.view]:
+            x.release()
+        self.mm.close()
+
+
+# row displacement packing, rows is a list of dicts (column -> value) holding only
+# the non default cells, row r column c is stored at base[r] + c if check[base[r] + c] == r
+def packRows(rows:list) -> tuple:
+    base = array("i", [0]) * len(rows)
+    check = array("i")
+    value = array("i")
+
+    # denser rows are harder to fit, place them first
+    order = list(range(len(rows)))
+    order.sort(key = lambda r : -len(rows[r]))
+
+    # lowest index which may still be free
+    first_free = 0
+    for r in order:
+        cols = list(rows[r].keys())
+        if len(cols) == 0:
+            continue
+        b = max(0, first_free - min(cols))
+        while True:
+            fit = True
+            for c in cols:
+                if b + c < len(check) and check[b + c] != -1:
+                    fit = False
+                    break
+            if fit:
+                break
+            b += 1
+        need = b + max(cols) + 1
+        if need > len(check):
+            check.extend(array("i", [-1]) * (need - len(check)))
+            value.extend(array("i", [0]) * (need - len(value)))
+        for c in cols:
+            check[b + c] = r
+            value[b + c] = rows[r][c]
+        base[r] = b
+        while first_free < len(check) and check[first_free] != -1:
+            first_free += 1
+    return (base, check, value)
+
+
+class CompressedParseTable:
+    '''ParseTable packed yacc style, with the same lookup interface.
+    Every ACTION row gets a default reduction and GOTO columns get a default state,
+    the other cells are packed by row displacement. A default reduction may delay
+    an error until the next shift, but never accepts a wrong sentence.'''
+
+    def __init__(self, table:ParseTable):
+        self.state_count = table.state_count
+        self.guard_id = table.guard_id
+        self.terminals = table.terminals
+        self.nonterminals = table.nonterminals
+        self.term_ids = table.term_ids
+        self.nonterm_ids = table.nonterm_ids
+        self.prod_lhs = table.prod_lhs
+        self.prod_len = table.prod_len
+
+        # ACTION, one row per state, default is the most common reduction of the row
+        self.action_default = array("i", [ParseTable.Error]) * table.state_count
+        rows = []
+        state = 0
+        while state < table.state_count:
+            row = {}
+            counts = {}
+            t = 0
+            while t < table.action_width:
+                v = table.getAction(state, t)
+                if v != ParseTable.Error:
+                    row[t] = v
+                    if v < 0 and v != ParseTable.Accept:
+                        counts[v] = counts.get(v, 0) + 1
+                t += 1
+            if len(counts) != 0:
+                default = max(counts, key = lambda v : counts[v])
+                self.action_default[state] = default
+                row = dict([(t, v) for (t, v) in row.items() if v != default])
+            rows.append(row)
+            state += 1
+        (self.action_base, self.action_check, self.action_value) = packRows(rows)
+
+        # GOTO, one row per nonterminal, default is the most common target state
+        self.goto_default = array("i", [-1]) * table.goto_width
+        rows = []
+        nt = 0
+        while nt < table.goto_width:
+            row = {}
+            counts = {}
+            state = 0
+            while state < table.state_count:
+                v = table.getGoto(state, nt)
+                if v != -1:
+                    row[state] = v
+                    counts[v] = counts.get(v, 0) + 1
+                state += 1
+            if len(counts) != 0:
+                default = max(counts, key = lambda v : counts[v])
+                self.goto_default[nt] = default
+                row = dict([(s, v) for (s, v) in row.items() if v != default])
+            rows.append(row)
+            nt += 1
+        (self.goto_base, self.goto_check, self.goto_value) = packRows(rows)
+
+    def getAction(self, state:int, term_id:int) -> int:
+        i = self.action_base[state] + term_id
+        if i < len(self.action_check) and self.action_check[i] == state:
+            return self.action_value[i]
+        return self.action_default[state]
+
+    def getGoto(self, state:int, nonterm_id:int) -> int:
+        i = self.goto_base[nonterm_id] + state
+        if i < len(self.goto_check) and self.goto_check[i] == nonterm_id:
+            return self.goto_value[i]
+        return self.goto_default[nonterm_id]
+
+    getTokenIds = ParseTable.getTokenIds
+
+    def sizeInBytes(self) -> int:
+        ret = 0
+        for x in [self.action_default, self.action_base, self.action_check, self.action_value,
+                  self.goto_default, self.goto_base, self.goto_check, self.goto_value,
+                  self.prod_lhs, self.prod_len]:
+            ret += x.itemsize * len(x)
+        return ret
+
+
+
+# the LR driver without any trace, table is a ParseTable, CompressedParseTable or
+# MappedParseTable and token_ids any iterable of terminal ids, None marks an unknown
+# token. The guard is appended here. reduce_callback(prod_id) is called on every
+# reduction. Only the state stack is kept, so memory does not grow with the input.
+def runParser(table, token_ids, reduce_callback = None) -> bool:
+    get_action = table.getAction
+    get_goto = table.getGoto
+    prod_lhs = table.prod_lhs
+    prod_len = table.prod_len
+    state_stack = [0]
+
+    for tid in itertools.chain(token_ids, (table.guard_id,)):
+        if tid is None:
+            return False
+        while True:
+            act = get_action(state_stack[-1], tid)
+            if act > 0:
+                state_stack.append(act - 1)
+                break
+            if act == ParseTable.Error:
+                return False
+            prod_id = -act - 1
+            if reduce_callback != None:
+                reduce_callback(prod_id)
+            pop_len = prod_len[prod_id]
+            if pop_len != 0:
+                del state_stack[-pop_len:]
+            if act == ParseTable.Accept:
+                return True
+            state_stack.append(get_goto(state_stack[-1], prod_lhs[prod_id]))
+    return False
+
+
+# the LR driver with a value stack, tokens is an iterable of (terminal id, value), a None
+# terminal id marks an unknown token. A shifted token pushes its value, a reduction by
+# prod_id pops the values of the right side and pushes actions[prod_id](*values).
+# returns (True, value of the start symbol) or (False, None)
+def runParserValues(table, tokens, actions:list) -> tuple:
+    get_action = table.getAction
+    get_goto = table.getGoto
+    prod_lhs = table.prod_lhs
+    prod_len = table.prod_len
+    state_stack = [0]
+    value_stack = []
+
+    for (tid, value) in itertools.chain(tokens, ((table.guard_id, None),)):
+        if tid is None:
+            return (False, None)
+        while True:
+            act = get_action(state_stack[-1], tid)
+            if act > 0:
+                state_stack.append(act - 1)
+                value_stack.append(value)
+                break
+            if act == ParseTable.Error:
+                return (False, None)
+            if act == ParseTable.Accept:
+                return (True, value_stack[-1])
+            prod_id = -act - 1
+            pop_len = prod_len[prod_id]
+            if pop_len != 0:
+                values = value_stack[-pop_len:]
+                del value_stack[-pop_len:]
+                del state_stack[-pop_len:]
+                value_stack.append(actions[prod_id](*values))
+            else:
+                value_stack.append(actions[prod_id]())
+            state_stack.append(get_goto(state_stack[-1], prod_lhs[prod_id]))
+    return (False, None)
+
+
+class ParseTree:
+    '''A parse tree in flat arrays. Inner nodes are numbered in the order they were
+    reduced, the root is the last one. A child reference c >= 0 is an inner node, c < 0
+    is the leaf of token -c - 1 of the sentence, tokens holds the terminal ids.
+    The children of node n are child[child_start[n]:child_start[n + 1]].'''
+
+    # reductions are the prod_id of every reduction without the accepting one,
+    # shapes[prod_id] tells for every symbol of the right side, without the eplision,
+    # if it is a nonterminal. The reductions of an LR parse are a rightmost derivation
+    # backwards, so walking them from the end expands the rightmost nonterminal first
+    # and the terminals are the tokens from the end of the sentence
+    def __init__(self, reductions:array, tokens:array, shapes:list):
+        self.prods = reductions
+        self.tokens = tokens
+        self.child_start = array("i", [0]) * (len(reductions) + 1)
+        total = 0
+        i = 0
+        while i < len(reductions):
+            self.child_start[i] = total
+            total += len(shapes[reductions[i]])
+            i += 1
+        self.child_start[len(reductions)] = total
+        self.child = array("i", [0]) * total
+        self.root = len(reductions) - 1
+
+        child = self.child
+        child_start = self.child_start
+        cursor = len(tokens) - 1
+        next_node = self.root - 1
+        # the nodes being filled and the next position of each, right to left
+        frame_nodes = [self.root]
+        frame_pos = [len(shapes[reductions[self.root]]) - 1]
+        while len(frame_nodes) != 0:
+            pos = frame_pos[-1]
+            if pos < 0:
+                frame_nodes.pop()
+                frame_pos.pop()
+                continue
+            frame_pos[-1] = pos - 1
+            node = frame_nodes[-1]
+            if shapes[reductions[node]][pos]:
+                child[child_start[node] + pos] = next_node
+                frame_nodes.append(next_node)
+                frame_pos.append(len(shapes[reductions[next_node]]) - 1)
+                next_node -= 1
+            else:
+                child[child_start[node] + pos] = -cursor - 1
+                cursor -= 1
+
+    def nodeCount(self) -> int:
+        return len(self.prods)
+
+    def production(self, node:int) -> int:
+        return self.prods[node]
+
+    def children(self, node:int) -> array:
+        return self.child[self.child_start[node]:self.child_start[node + 1]]
+
+    @staticmethod
+    def isLeaf(ref:int) -> bool:
+        return ref < 0
+
+    @staticmethod
+    def tokenIndex(ref:int) -> int:
+        return -ref - 1
+
+    # nested tuples (production str, children...) with the token values as leaves,
+    # prod_strs[prod_id] and term_strs[term_id] give the names, for printing
+    def toTuple(self, prod_strs:list, term_strs:list, node:int = None):
+        if node == None:
+            node = self.root
+        ret = [prod_strs[self.prods[node]]]
+        for c in self.children(node):
+            if c < 0:
+                ret.append(term_strs[self.tokens[-c - 1]])
+            else:
+                ret.append(self.toTuple(prod_strs, term_strs, c))
+        return tuple(ret)
+
+    def sizeInBytes(self) -> int:
+        ret = 0
+        for x in [self.prods, self.tokens, self.child_start, self.child]:
+            ret += x.itemsize * len(x)
+        return ret
+
+
+# yield the token values of a file object separated by whitespace,
+# reading block_size characters at a time
+def readTokenValues(f, block_size:int = 1 << 16):
+    rest = ""
+    while True:
+        block = f.read(block_size)
+        if len(block) == 0:
+            break
+        parts = (rest + block).split()
+        # the last value may continue in the next block
+        if len(parts) != 0 and not block[-1].isspace():
+            rest = parts.pop()
+        else:
+            rest = ""
+        for x in parts:
+            yield x
+    if len(rest) != 0:
+        yield rest
+
+
+# the token value strs of source, a text file object, a str of token values separated by
+# whitespace, or an iterable of Tokens or strs
+def tokenValues(source):
+    if hasattr(source, "read"):
+        return readTokenValues(source)
+    if isinstance(source, str):
+        return iter(source.split())
+    return (x.val if isinstance(x, Token) else x for x in source)
+
+
+# table of the batch worker process, set once by batchInit
+batch_table = None
+
+def batchInit(table, path:str, offset:int):
+    global batch_table
+    if path != None:
+        batch_table = MappedParseTable(path, offset)
+    else:
+        batch_table = table
+
+# parse a sentence given as a string of token values separated by spaces
+def batchParseLine(table, line:str) -> int:
+    term_ids = table.term_ids
+    ids = [term_ids.get(x) for x in line.split()]
+    if None in ids:
+        return LRAnalyzer.SentenceStatus.UnknownToken
+    if runParser(table, ids):
+        return LRAnalyzer.SentenceStatus.Accepted
+    return LRAnalyzer.SentenceStatus.Rejected
+
+def batchParseChunk(lines:list) -> list:
+    return [batchParseLine(batch_table, x) for x in lines]
+
+
+class TableCache:
+    '''Parse tables stored on disk, one file per grammar, named by the grammar hash.
+    A file holds the conflict list followed by ParseTable.toBytes(), the least
+    recently used files are removed when the directory grows over max_bytes.
+    With mapped set, loaded tables are MappedParseTables over the cache file.'''
+    Magic = b"LRTC"
+    Version = 1
+    Suffix = ".lrtc"
+
+    def __init__(self, path:str, max_bytes:int = 64 * 1024 * 1024, mapped:bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mapped = mapped
+        os.makedirs(path, exist_ok = True)
+
+    # prod_list is LRAnalyzer.prod_list, production ids are part of the table so the order counts
+    # prod_precedence is LRAnalyzer.prod_precedence and token_precedence is LRAnalyzer.token_precedence,
+    # the conflicts they resolve change the table, a lookahead terminal decides with its own level
+    @staticmethod
+    def grammarKey(prod_list:list, eplision_str, argument_str, guard_str, mode, prod_precedence:list = None,
+                   token_precedence:dict = None) -> str:
+        lines = [TableCache.Magic.decode(), str(TableCache.Version), str(ParseTable.Version),
+                 eplision_str, argument_str, guard_str, str(mode)]
+        for (left_token, right_tokens) in prod_list:
+            lines.append(left_token.val + " -> " + " ".join([x.val for x in right_tokens]))
+        if prod_precedence != None and prod_precedence.count(None) != len(prod_precedence):
+            lines.append(str(prod_precedence))
+        if token_precedence != None and len(token_precedence) != 0:
+            for token_str in sorted(token_precedence):
+                (level, assoc) = token_precedence[token_str]
+                lines.append("%{} {} {}".format(assoc, level, token_str))
+        # imported here, headless parsing without a cache does not pay for it
+        import hashlib
+        return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+    def fileName(self, key:str) -> str:
+        return os.path.join(self.path, key + TableCache.Suffix)
+
+    # returns (ParseTable or MappedParseTable, list of (state, terminal value)) or None
+    def load(self, key:str):
+        name = self.fileName(key)
+        try:
+            f = open(name, "rb")
+            if self.mapped:
+                # only the conflict list is read, the table itself is mapped
+                data = f.read(12)
+                if len(data) == 12:
+                    data += f.read(8 * struct.unpack_from("<I", data, 8)[0])
+            else:
+                data = f.read()
+            f.close()
+        except OSError:
+            return None
+
+        if len(data) < 12 or data[:4] != TableCache.Magic:
+            return None
+        (version, conflict_count) = struct.unpack_from("<II", data, 4)
+        if version != TableCache.Version:
+            return None
+        pos = 12
+        conflicts_raw = array("i")
+        conflicts_raw.frombytes(data[pos:pos + 8 * conflict_count])
+        if sys.byteorder == "big":
+            conflicts_raw.byteswap()
+        pos += 8 * conflict_count
+
+        if self.mapped:
+            try:
+                table = MappedParseTable(name, pos)
+            except ValueError:
+                return None
+        else:
+            table = ParseTable.fromBytes(data[pos:])
+        if table == None:
+            return None
+        conflicts = []
+        i = 0
+        while i < len(conflicts_raw):
+            conflicts.append((conflicts_raw[i], table.terminals[conflicts_raw[i + 1]]))
+            i += 2
+
+        # mark it as recently used
+        try:
+            os.utime(name)
+        except OSError:
+            pass
+        return (table, conflicts)
+
+    # conflicts is a list of (state, terminal value)
+    def store(self, key:str, table:ParseTable, conflicts:list):
+        conflicts_raw = array("i")
+        for (state, terminal) in conflicts:
+            conflicts_raw.append(state)
+            conflicts_raw.append(table.term_ids[terminal])
+        if sys.byteorder == "big":
+            conflicts_raw.byteswap()
+        data = TableCache.Magic + struct.pack("<II", TableCache.Version, len(conflicts)) \
+            + conflicts_raw.tobytes() + table.toBytes()
+
+        name = self.fileName(key)
+        tmp_name = name + ".{}.tmp".format(os.getpid())
+        f = open(tmp_name, "wb")
+        f.write(data)
+        f.close()
+        os.replace(tmp_name, name)
+        self.evict()
+
+    # remove the least recently used files until the cache fits in max_bytes
+    def evict(self):
+        files = []
+        total = 0
+        for x in os.listdir(self.path):
+            if not x.endswith(TableCache.Suffix):
+                continue
+            try:
+                st = os.stat(os.path.join(self.path, x))
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, x))
+            total += st.st_size
+        files.sort()
+        i = 0
+        # the newest file is kept even if it is larger than max_bytes
+        while total > self.max_bytes and i < len(files) - 1:
+            try:
+                os.remove(os.path.join(self.path, files[i][2]))
+            except OSError:
+                pass
+            total -= files[i][1]
+            i += 1
+
+
+class ConflictReport:
+    '''A conflicting ACTION cell, actions are the (ActionType, Item) of the cell and
+    prefix is a shortest token sequence, terminals and nonterminals, reaching the state.'''
+    __slots__ = ("state", "token", "actions", "prefix")
+
+    def __init__(self, state:int, token:Token, actions:list, prefix:list):
+        self.state = state
+        self.token = token
+        self.actions = actions
+        self.prefix = prefix
+
+    def __str__(self) -> str:
+        type_str = ["Shift", "Reduce"]
+        outstr = "state {} on {}, after \"{}\"".format(self.state, self.token.val, " ".join([x.val for x in self.prefix]))
+        for (action_type, item) in self.actions:
+            outstr += "\n    {} {}".format(type_str[action_type], item)
+        return outstr
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+class AnalyzerStats:
+    '''Where an LRAnalyzer spent its build, and counters of the sentences it analyzed.
+    phase_seconds maps a build phase to its wall time, counts holds the sizes of the
+    result, peak_memory is the tracemalloc peak in bytes of a build with profile set.'''
+
+    def __init__(self):
+        self.phase_seconds = {}
+        self.counts = {}
+        self.peak_memory = None
+        self.parse = {"sentences" : 0, "accepted" : 0, "shifts" : 0, "reduces" : 0, "max_stack_depth" : 0}
+
+    # add the wall time since start, a perf_counter() value, to the phase, returns the current time
+    def addPhase(self, name:str, start:float) -> float:
+        now = time.perf_counter()
+        self.phase_seconds[name] = self.phase_seconds.get(name, 0.0) + now - start
+        return now
+
+    def addParse(self, accepted:bool, shifts:int, reduces:int, max_stack_depth:int):
+        parse = self.parse
+        parse["sentences"] += 1
+        if accepted:
+            parse["accepted"] += 1
+        parse["shifts"] += shifts
+        parse["reduces"] += reduces
+        if max_stack_depth > parse["max_stack_depth"]:
+            parse["max_stack_depth"] = max_stack_depth
+
+    def toDict(self) -> dict:
+        return {"phase_seconds" : dict(self.phase_seconds), "counts" : dict(self.counts),
+                "peak_memory" : self.peak_memory, "parse" : dict(self.parse)}
+
+    # write toDict() as JSON, f is a path or a text file object
+    def dump(self, f):
+        # imported here, with re and enum it is most of the import time of lab3
+        import json
+        if hasattr(f, "write"):
+            json.dump(self.toDict(), f, indent = 2, sort_keys = True)
+            return
+        out = open(f, "w")
+        json.dump(self.toDict(), out, indent = 2, sort_keys = True)
+        out.close()
+
+    def __str__(self) -> str:
+        return str(self.toDict())
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
 class LRAnalyzer:
 
     class ActionType:
         Shift = 0
         Reduce = 1
 
-    ''' productions are special, indexed by string '''
+    # LR1 builds the canonical LR(1) collection,
+    # LALR1 merges the states which have the same core while building it
+    class Mode:
+        LR1 = 0
+        LALR1 = 1
+
+    # associativity of a precedence level, as declared by %left, %right and %nonassoc
+    class Assoc:
+        Left = "left"
+        Right = "right"
+        NonAssoc = "nonassoc"
 
-    def __init__(self, pstr: list, eplision_str, argument_str, guard_str):
+    # result of a sentence in parseBatch
+    class SentenceStatus:
+        Accepted = 0
+        Rejected = 1
+        UnknownToken = 2
 
+    ''' productions are special, indexed by string '''
+
+    # with a TableCache the parse table is loaded from it when the grammar was seen before,
+    # then only parse_table is built, the closures and the action table stay None
+    # previous is the analyzer of an earlier version of the grammar, the closure
+    # contributions of the nonterminals the edit does not touch are taken from it,
+    # FIRST sets, states and the action table are still built in full
+    # the time of every build phase is recorded in stats, with profile the peak memory too
+    # pstr may hold %left, %right and %nonassoc lines and %prec, see readDeclarations, the
+    # shift/reduce conflicts they decide are resolved in generateAction
+    def __init__(self, pstr: list, eplision_str, argument_str, guard_str, mode = Mode.LR1, table_cache = None,
+                 previous = None, profile = False):
+
+        self.stats = AnalyzerStats()
+        # tracing slows the build down a lot, it only runs when asked for
+        if profile:
+            import tracemalloc
+        tracing = profile and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif profile:
+            tracemalloc.reset_peak()
+        phase_start = time.perf_counter()
+
+        self.mode = mode
         self.productions = {}
         self.items = {}
         self.ttab = TokenTable()
         self.eplision = Token(eplision_str, Token.TypeTerminal)
 
+        (pstr, declarations, prec_tokens) = readDeclarations(pstr)
         orginal_first_prod = Production(pstr[0], self.ttab)
         arguemnted_first_str = argument_str + " -> " + orginal_first_prod.left
         argumented_pstr = [arguemnted_first_str] + pstr
@@ -295,29 +1173,125 @@ class LRAnalyzer:
             prod = Production(x, self.ttab)
             self.productions[prod.left] = prod
         
+        # every alternative gets a production id, Items refer to it
+        # prod_list[prod_id] is (left token, tuple of right tokens)
+        # prod_alternatives[left token] is a list of prod_id
+        self.prod_list = []
+        self.prod_alternatives = {}
+        for prod in self.productions.values():
+            left_token = self.ttab.getToken(prod.left)
+            self.prod_alternatives[left_token] = []
+            for candi_strs in prod.rights:
+                self.prod_alternatives[left_token].append(len(self.prod_list))
+                self.prod_list.append((left_token, tuple([self.ttab.getToken(x) for x in candi_strs])))
+
+        # precedence of the declared terminals, token value -> (level, Assoc), a higher level
+        # binds tighter. A production has the precedence of its %prec terminal, or else of
+        # its last terminal, prod_precedence[prod_id] is None when that one has none
+        self.token_precedence = {}
+        level = 0
+        for (assoc, token_strs) in declarations:
+            level += 1
+            for x in token_strs:
+                self.token_precedence[x] = (level, assoc)
+        self.prod_precedence = []
+        for (left_token, right_tokens) in self.prod_list:
+            prec_token = prec_tokens.get((left_token.val, tuple([x.val for x in right_tokens])))
+            if prec_token == None:
+                for x in reversed(right_tokens):
+                    if x.isTerminal() and x != self.eplision:
+                        prec_token = x.val
+                        break
+            self.prod_precedence.append(self.token_precedence.get(prec_token))
+
         self.eplision_token = self.ttab.getToken(eplision_str)
         self.argument_token = self.ttab.getToken(argument_str)
         self.orginal_start_token = self.ttab.getToken(self.productions[self.argument_token.val].rights[0][0])
-        self.first_sets = FirstSets(self.productions, self.ttab, self.eplision)
-
         self.guard_token = Token(guard_str, Token.TypeTerminal)
         self.ttab.AddToken(self.guard_token)
 
-        self.first_sets.first_sets[self.guard_token] = {self.guard_token}
-        self.first_sets.nullable[self.guard_token] = False
+        # terminals get ids for the preview token bitsets of Items, bit i is terminal_list[i]
+        self.terminal_list = self.getTerminal()
+        self.terminal_list.sort(key = lambda t : t.val)
+        self.terminal_index = {}
+        for x in self.terminal_list:
+            self.terminal_index[x] = len(self.terminal_index)
+        phase_start = self.stats.addPhase("productions", phase_start)
+
+        self.parse_table = None
+        self.first_sets = None
+        self.closures_storage = None
+        self.closures_jump_table = None
+        self.goto_table = None
+        self.action_table = None
+        self.conflict_reports = None
+        self.prod_shapes = None
+        self.closure_stats = None
+        self.first_bits = None
+        self.expand_memo = None
+
+        cache_key = None
+        cached = None
+        if table_cache != None:
+            cache_key = TableCache.grammarKey(self.prod_list, eplision_str, argument_str, guard_str, mode,
+                                              self.prod_precedence, self.token_precedence)
+            cached = table_cache.load(cache_key)
+            phase_start = self.stats.addPhase("cache_load", phase_start)
+
+        if cached != None:
+            (self.parse_table, conflict_values) = cached
+            conflict_list = [(state, self.ttab.getToken(t)) for (state, t) in conflict_values]
+        else:
+            self.first_sets = FirstSets(self.productions, self.ttab, self.eplision)
+            self.first_sets.first_sets[self.guard_token] = {self.guard_token}
+            self.first_sets.nullable[self.guard_token] = False
+            phase_start = self.stats.addPhase("first_sets", phase_start)
+
+            self.generateClosureSet(previous)
+            phase_start = self.stats.addPhase("closures", phase_start)
+            # generateAction records the conflicts phase itself
+            conflict_list = self.generateAction()
+            phase_start = time.perf_counter()
 
-        self.generateClosureSet()
-        conflict_list = self.generateAction()
         if len(conflict_list) != 0:
             self.lr_check = False
         else:
             self.lr_check = True
         self.conflict_list = conflict_list
 
+        if cached == None and table_cache != None:
+            self.compile()
+            table_cache.store(cache_key, self.parse_table, [(state, t.val) for (state, t) in conflict_list])
+            phase_start = self.stats.addPhase("cache_store", phase_start)
+
+        self.countBuild()
+        if profile:
+            self.stats.peak_memory = tracemalloc.get_traced_memory()[1]
+        if tracing:
+            tracemalloc.stop()
+
+    # sizes of the build result, for stats.counts
+    def countBuild(self):
+        counts = self.stats.counts
+        counts["productions"] = len(self.prod_list)
+        counts["terminals"] = len(self.terminal_list)
+        counts["nonterminals"] = len(self.prod_alternatives)
+        counts["states"] = self.stateCount()
+        counts["conflicts"] = len(self.conflict_list)
+        if self.closures_storage != None:
+            counts["items"] = sum([len(x) for x in self.closures_storage])
+            counts["edges"] = sum([len(x) for x in self.closures_jump_table.values()])
+        if self.closure_stats != None:
+            counts.update(self.closure_stats)
+        if self.parse_table != None:
+            counts["table_bytes"] = self.parse_table.sizeInBytes()
+
     def checkLR(self):
         return self.lr_check
     
     def stateCount(self):
+        if self.closures_storage == None:
+            return self.parse_table.state_count
         return len(self.closures_storage)
 
     def terminalCount(self):
@@ -332,13 +1306,257 @@ class LRAnalyzer:
     def getNonTerminal(self):
         return list(filter(lambda t : t.isNonTerminal(), self.ttab.tokens.values()))
 
-    def analyze(self, sentence : list, prority_resolver = None) -> tuple:
-        def value_zero(actions_list):
-            return 0
+    # accept or reject the sentence without tracing, reduce_callback(prod_id) is
+    # called on every reduction, prod_list[prod_id] is the reduced production
+    def parse(self, sentence, reduce_callback = None) -> bool:
+        if self.parse_table == None:
+            self.compile()
+        term_ids = self.parse_table.term_ids
+        return runParser(self.parse_table, (term_ids.get(x.val) for x in sentence), reduce_callback)
+
+    # parse tokens as they arrive, source is a text file object, a str of token values
+    # or an iterator of Tokens or token value strings, memory stays bounded by the state stack
+    def parseStream(self, source, reduce_callback = None) -> bool:
+        if self.parse_table == None:
+            self.compile()
+        term_ids = self.parse_table.term_ids
+        return runParser(self.parse_table, (term_ids.get(x) for x in tokenValues(source)), reduce_callback)
+
+    # the production as a string, like "E -> E + T", the keys of evaluate's actions
+    def productionStr(self, prod_id:int) -> str:
+        (left_token, right_tokens) = self.prod_list[prod_id]
+        return left_token.val + " -> " + " ".join([x.val for x in right_tokens])
+
+    # for every production, if each symbol of its right side is a nonterminal, see ParseTree
+    def productionShapes(self) -> list:
+        if self.prod_shapes == None:
+            shapes = []
+            for (left_token, right_tokens) in self.prod_list:
+                shapes.append(tuple([x.isNonTerminal() for x in right_tokens if x != self.eplision]))
+            self.prod_shapes = shapes
+        return self.prod_shapes
+
+    # parse source like parseStream and return its ParseTree, or None if it is rejected,
+    # the tree only stores integers, the reductions are appended to an array while parsing
+    def parseTree(self, source) -> ParseTree:
+        if self.parse_table == None:
+            self.compile()
+        term_ids = self.parse_table.term_ids
+        tokens = array("i")
+        reductions = array("i")
+
+        def tokenIds():
+            for x in tokenValues(source):
+                tid = term_ids.get(x)
+                if tid is None:
+                    yield None
+                    return
+                tokens.append(tid)
+                yield tid
+
+        if not runParser(self.parse_table, tokenIds(), reductions.append):
+            return None
+        # the last reduction is the argumented production accepting the sentence
+        return ParseTree(reductions[:-1], tokens, self.productionShapes())
+
+    # parse source like parseStream and run semantic actions while reducing, actions maps a
+    # prod_id or a productionStr to a function of the values of the right side. A token's
+    # value is leaf(token value str), the str itself without leaf. A production without an
+    # action passes the value of a single symbol on, and makes a tuple of several values.
+    # returns (accepted, value of the start symbol)
+    def evaluate(self, source, actions:dict, leaf = None) -> tuple:
+        if self.parse_table == None:
+            self.compile()
+        term_ids = self.parse_table.term_ids
+
+        def passValue(*values):
+            if len(values) == 1:
+                return values[0]
+            return values
+
+        action_list = [passValue] * len(self.prod_list)
+        for prod_id in range(len(self.prod_list)):
+            action = actions.get(prod_id)
+            if action == None:
+                action = actions.get(self.productionStr(prod_id))
+            if action != None:
+                action_list[prod_id] = action
+
+        if leaf == None:
+            tokens = ((term_ids.get(x), x) for x in tokenValues(source))
+        else:
+            tokens = ((term_ids.get(x), leaf(x)) for x in tokenValues(source))
+        return runParserValues(self.parse_table, tokens, action_list)
+
+    # parse every sentence of the iterable (strings of token values separated by spaces,
+    # a file object or a str of lines works too) and yield (index, SentenceStatus) in input order.
+    # chunks of at most chunk_size sentences are parsed by a pool of workers processes,
+    # with workers == 1 everything runs in this process
+    def parseBatch(self, sentences, workers = None, chunk_size = 1000):
+        if self.parse_table == None:
+            self.compile()
+        table = self.parse_table
+        # a str is a sentence a line like a file, not a sentence a char
+        if isinstance(sentences, str):
+            sentences = sentences.splitlines()
+
+        def chunks():
+            it = iter(sentences)
+            while True:
+                chunk = list(itertools.islice(it, chunk_size))
+                if len(chunk) == 0:
+                    return
+                yield chunk
+
+        if workers == None:
+            workers = os.cpu_count() or 1
+
+        index = 0
+        if workers == 1:
+            for chunk in chunks():
+                for x in chunk:
+                    yield (index, batchParseLine(table, x))
+                    index += 1
+            return
+
+        # a batch of known size is cut so that every worker gets a few chunks, with
+        # fewer chunks than workers some of them would have nothing to do
+        if hasattr(sentences, "__len__"):
+            chunk_size = max(1, min(chunk_size, len(sentences) // (4 * workers)))
+
+        if isinstance(table, MappedParseTable):
+            initargs = (None, table.path, table.offset)
+        else:
+            initargs = (table, None, 0)
+        # imported here, it takes longer than the rest of the module
+        import concurrent.futures
+        executor = concurrent.futures.ProcessPoolExecutor(workers, initializer = batchInit, initargs = initargs)
+        try:
+            # a bounded number of chunks in flight keeps memory flat for large inputs
+            max_pending = 4 * workers
+            pending = collections.deque()
+            for chunk in chunks():
+                pending.append(executor.submit(batchParseChunk, chunk))
+                while len(pending) >= max_pending:
+                    for status in pending.popleft().result():
+                        yield (index, status)
+                        index += 1
+            while len(pending) != 0:
+                for status in pending.popleft().result():
+                    yield (index, status)
+                    index += 1
+        finally:
+            executor.shutdown(cancel_futures = True)
+
+    # parseBatch over a file holding one sentence per line
+    def parseBatchFile(self, path:str, workers = None, chunk_size = 1000):
+        f = open(path, "r")
+        try:
+            for x in self.parseBatch(f, workers, chunk_size):
+                yield x
+        finally:
+            f.close()
+
+    # trace(step) is called with every step, (state stack, token stack, remaining sentence, info),
+    # without trace the steps are collected and returned
+    def analyze(self, sentence : list, prority_resolver = None, trace = None) -> tuple:
+        # the resolver has to see every conflicting action, so it needs the action table
+        if prority_resolver != None:
+            return self.analyzeWithResolver(sentence, prority_resolver, trace)
+
+        if self.parse_table == None:
+            self.compile()
+        table = self.parse_table
+        get_action = table.getAction
+        get_goto = table.getGoto
+        prod_lhs = table.prod_lhs
+        prod_len = table.prod_len
+
+        sentence = sentence + [self.guard_token]
+        sentence_len = len(sentence)
+        sentence_pos = 0
+        sentence_ids = table.getTokenIds(sentence)
+
+        analyze_status = False
+        output_list = []
+
+        def append_output_list(s_stack, t_stack, remaining_sentence, info):
+            step = (copy(s_stack),copy(t_stack), copy(remaining_sentence), info)
+            if trace != None:
+                trace(step)
+            else:
+                output_list.append(step)
+
+        state_stack = [0]
+        token_stack = [self.guard_token]
+
+        def auto_append(info):
+            append_output_list(state_stack, token_stack, sentence[sentence_pos:], info)
+
+        if sentence_ids == None:
+            auto_append("Analyze End")
+            self.stats.addParse(False, 0, 0, 1)
+            return (analyze_status, output_list)
         
-        if prority_resolver == None:
-            prority_resolver = value_zero
+        shifts = 0
+        reduces = 0
+        max_stack_depth = 1
+        while sentence_pos < sentence_len:
+            cur_state = state_stack[-1]
+            act = get_action(cur_state, sentence_ids[sentence_pos])
+            if act == ParseTable.Error:
+                analyze_status = False
+                break
 
+            if act > 0:
+                shifts += 1
+                cur_token = sentence[sentence_pos]
+                shift_item = self.getShiftItem(cur_state, cur_token)
+                if shift_item is None:
+                    auto_append("{}, Shift {}".format(cur_token.val, act - 1))
+                else:
+                    auto_append(str(shift_item) + ", Shift")
+                state_stack.append(act - 1)
+                token_stack.append(cur_token)
+                sentence_pos += 1
+                if len(state_stack) > max_stack_depth:
+                    max_stack_depth = len(state_stack)
+            else:
+                reduces += 1
+                prod_id = -act - 1
+                (left_token, right_tokens) = self.prod_list[prod_id]
+                item = Item(prod_id, left_token, right_tokens, len(right_tokens),
+                            1 << self.terminal_index[sentence[sentence_pos]], self.terminal_list)
+                auto_append(str(item) + ", Reduce")
+                pop_len = prod_len[prod_id]
+                if pop_len != 0:
+                    del token_stack[-pop_len:]
+                    del state_stack[-pop_len:]
+                if act == ParseTable.Accept:
+                    analyze_status = True
+                    break
+                token_stack.append(left_token)
+                state_stack.append(get_goto(state_stack[-1], prod_lhs[prod_id]))
+                if len(state_stack) > max_stack_depth:
+                    max_stack_depth = len(state_stack)
+        
+        auto_append("Analyze End")
+        self.stats.addParse(analyze_status, shifts, reduces, max_stack_depth)
+        # output_list is (list of int, list of token, str)
+        return (analyze_status, output_list)
+
+    # the first shift item of the state on the token, only used to describe a shift
+    def getShiftItem(self, state:int, token:Token) -> Item:
+        if self.action_table == None:
+            return None
+        for (action_type, item) in self.action_table[state][token]:
+            if action_type == LRAnalyzer.ActionType.Shift:
+                return item
+        return None
+
+    def analyzeWithResolver(self, sentence : list, prority_resolver, trace = None) -> tuple:
+        if self.action_table == None:
+            raise ValueError("a priority resolver needs the closures, the table was loaded from a cache")
 
         sentence = sentence + [self.guard_token]
         sentence_len = len(sentence)
@@ -348,8 +1566,11 @@ class LRAnalyzer:
         output_list = []
 
         def append_output_list(s_stack, t_stack, remaining_sentence, info):
-            output_list.append((copy(s_stack),copy(t_stack), copy(remaining_sentence), info))
-            print(output_list[-1])
+            step = (copy(s_stack),copy(t_stack), copy(remaining_sentence), info)
+            if trace != None:
+                trace(step)
+            else:
+                output_list.append(step)
 
         state_stack = [0]
         token_stack = [self.guard_token]
@@ -357,6 +1578,9 @@ class LRAnalyzer:
         def auto_append(info):
             append_output_list(state_stack, token_stack, sentence[sentence_pos:], info)
         
+        shifts = 0
+        reduces = 0
+        max_stack_depth = 1
         while len(state_stack) != 0 and len(token_stack) != 0 and sentence_pos < sentence_len:
 
             cur_token:Token = sentence[sentence_pos]
@@ -366,22 +1590,29 @@ class LRAnalyzer:
                 analyze_status = False
                 break
 
-            (action_type, item) = actions_list[prority_resolver(actions_list)]
+            # the resolver only picks among conflicting actions, precedence declarations
+            # have left a single action in the cells they decide
+            if len(actions_list) == 1:
+                (action_type, item) = actions_list[0]
+            else:
+                (action_type, item) = actions_list[prority_resolver(actions_list)]
 
             if action_type == LRAnalyzer.ActionType.Shift:
                 auto_append(str(item) + ", Shift")
+                shifts += 1
                 next_state = self.closures_jump_table[cur_state][cur_token]
                 state_stack.append(next_state)
                 token_stack.append(cur_token)
                 sentence_pos += 1
             elif action_type == LRAnalyzer.ActionType.Reduce:
                 item:Item
+                reduces += 1
 
                 auto_append(str(item) + ", Reduce")
                 if item.right_tokens[0] != self.eplision:
                     pop_len = len(item.right_tokens)
-                    token_stack = token_stack[:-pop_len]
-                    state_stack = state_stack[:-pop_len]
+                    del token_stack[-pop_len:]
+                    del state_stack[-pop_len:]
 
                     if item.left_token == self.argument_token:
                         analyze_status = True
@@ -390,157 +1621,473 @@ class LRAnalyzer:
                 state_stack.append(self.closures_jump_table[state_stack[-1]][item.left_token])
             else:
                 raise Exception("Unexpected LRAnalyze.ActionType Value: {}".find(action_type))
+            if len(state_stack) > max_stack_depth:
+                max_stack_depth = len(state_stack)
         
         auto_append("Analyze End")
+        self.stats.addParse(analyze_status, shifts, reduces, max_stack_depth)
         # output_list is (list of int, list of token, str)
         return (analyze_status, output_list)
     
+    # the expand_memo entries of previous which are still valid for this grammar, with the
+    # production ids of this grammar. An entry of B holds the alternatives of the nonterminals
+    # reachable from B through the first symbols of alternatives, and the FIRST sets of the
+    # symbols in them, it is dropped when one of these changed
+    def reusableExpandMemo(self, previous) -> dict:
+        if previous == None or previous.expand_memo == None:
+            return {}
+        if [x.val for x in previous.terminal_list] != [x.val for x in self.terminal_list] \
+            or previous.eplision != self.eplision or previous.argument_token != self.argument_token:
+            return {}
+
+        def prodKey(prod):
+            (left_token, right_tokens) = prod
+            return (left_token.val, tuple([x.val for x in right_tokens]))
+
+        # a grammar may repeat an alternative, A -> a | a, the copies are told apart by
+        # their occurrence, so the reduce/reduce conflict between them stays
+        def occurrenceKeys(prod_list) -> list:
+            seen = {}
+            keys = []
+            for prod in prod_list:
+                key = prodKey(prod)
+                seen[key] = seen.get(key, 0) + 1
+                keys.append((key, seen[key]))
+            return keys
+
+        prod_ids = {}
+        new_keys = occurrenceKeys(self.prod_list)
+        for prod_id in range(len(new_keys)):
+            prod_ids[new_keys[prod_id]] = prod_id
+        old_keys = occurrenceKeys(previous.prod_list)
+
+        def alternativesKey(lra, token) -> list:
+            if not token in lra.prod_alternatives:
+                return None
+            return [prodKey(lra.prod_list[prod_id]) for prod_id in lra.prod_alternatives[token]]
+
+        # symbols whose FIRST set or nullable changed, terminals keep their ids so
+        # only nonterminals can change
+        first_changed = set()
+        for token in self.prod_alternatives:
+            old_bits = previous.first_bits.get(token)
+            if old_bits != self.first_bits[token] \
+                or previous.first_sets.queryNullable(token) != self.first_sets.queryNullable(token):
+                first_changed.add(token)
+
+        dirty = set()
+        # the first symbol of an alternative of B is expanded in the closure of B
+        expanded_by = {}
+        for token in self.prod_alternatives:
+            if alternativesKey(self, token) != alternativesKey(previous, token):
+                dirty.add(token)
+            for prod_id in self.prod_alternatives[token]:
+                right_tokens = self.prod_list[prod_id][1]
+                for x in right_tokens:
+                    if x in first_changed:
+                        dirty.add(token)
+                if right_tokens[0].isNonTerminal():
+                    if not right_tokens[0] in expanded_by:
+                        expanded_by[right_tokens[0]] = set()
+                    expanded_by[right_tokens[0]].add(token)
+
+        worklist = list(dirty)
+        while len(worklist) != 0:
+            token = worklist.pop()
+            for x in expanded_by.get(token, []):
+                if not x in dirty:
+                    dirty.add(x)
+                    worklist.append(x)
+
+        ret = {}
+        for (key, added) in previous.expand_memo.items():
+            if key[0] in dirty or not key[0] in self.prod_alternatives:
+                continue
+            entry = {}
+            for ((prod_id, pos), bits) in added.items():
+                entry[(prod_ids[old_keys[prod_id]], pos)] = bits
+            ret[key] = entry
+        return ret
+
     # generate the closures set and the states transition table
-    def generateClosureSet(self):
-        def closureHelper(iset:frozenset):
+    # with previous, the still valid closure contributions of its build are reused
+    def generateClosureSet(self, previous = None):
+        prod_list = self.prod_list
+        prod_alternatives = self.prod_alternatives
+        first_bits = self.first_sets.firstBits(self.terminal_index)
+        self.first_bits = first_bits
+
+        # position of the dot in a new item, it is after the eplision for an empty production
+        start_pos = []
+        for (left_token, right_tokens) in prod_list:
+            if right_tokens[0] == self.eplision:
+                start_pos.append(1)
+            else:
+                start_pos.append(0)
+
+        # for every (prod_id, pos) with the dot before a nonterminal it holds
+        # (the nonterminal, FIRST of the rest of the right side, if the rest is nullable)
+        expand = {}
+        prod_id = 0
+        while prod_id < len(prod_list):
+            right_tokens = prod_list[prod_id][1]
+            pos = start_pos[prod_id]
+            while pos < len(right_tokens):
+                if right_tokens[pos].isNonTerminal():
+                    bits = 0
+                    nullable = True
+                    for x in right_tokens[pos + 1:]:
+                        bits |= first_bits[x]
+                        if not self.first_sets.queryNullable(x):
+                            nullable = False
+                            break
+                    expand[(prod_id, pos)] = (right_tokens[pos], bits, nullable)
+                pos += 1
+            prod_id += 1
+
+        # hit and miss counters of the kernel memo (kernel_index) and of expand_memo,
+        # expand_reused is the number of entries taken from previous
+        stats = {"kernel_hits" : 0, "kernel_misses" : 0, "expand_hits" : 0, "expand_misses" : 0,
+                 "expand_reused" : 0}
+
+        # items are kept as a dict, (prod_id, pos) -> preview tokens bitset, the preview
+        # tokens of the same (prod_id, pos) are merged by OR
+        # the items are added to base and closed there, base must be closed
+        def closeItems(items:dict, base:dict) -> dict:
             item_stack = []
-            item_stack.extend(iset)
-            ret_set = set()
-            ret_set.update(iset)
+            for core in items:
+                old = base.get(core, 0)
+                new = old | items[core]
+                if new != old:
+                    base[core] = new
+                    item_stack.append(core)
             while len(item_stack) != 0:
-                item:Item = item_stack.pop()
-                if item.closureExtendable():
-                    next_token = item.right_tokens[item.pos]
-                    prod:Production = self.productions[next_token.val]
-                    sentence = item.right_tokens[item.pos + 1:]
-                    sentence.append(item.preview_token)
-                    sts_fst = self.first_sets.queryFirstOfSentence(sentence)
-
-                    for candi_strs in prod.rights:
-                        candi_tokens = [self.ttab.getToken(x) for x in candi_strs]
-                        for preview_token in sts_fst:
-                            new_item = Item(next_token, candi_tokens, 0, preview_token)
-                            if(candi_tokens[0] == self.eplision_token) :
-                                new_item.pos = 1
-                            if new_item in ret_set:
-                                continue
-                            else:
-                                ret_set.update([new_item])
-                                item_stack.append(new_item)
-            return frozenset(ret_set)
+                core = item_stack.pop()
+                if not core in expand:
+                    continue
+                (next_token, bits, nullable) = expand[core]
+                if nullable:
+                    bits |= base[core]
+                for prod_id in prod_alternatives[next_token]:
+                    new_core = (prod_id, start_pos[prod_id])
+                    old = base.get(new_core, 0)
+                    new = old | bits
+                    if new != old:
+                        base[new_core] = new
+                        item_stack.append(new_core)
+            return base
+
+        # (nonterminal, preview tokens bitset) -> the closure of its alternatives with
+        # these preview tokens, it is what an item with the dot before the nonterminal adds
+        expand_memo = self.reusableExpandMemo(previous)
+        stats["expand_reused"] = len(expand_memo)
+
+        # a closure is the union of the closures of its kernel items, so every kernel
+        # item adds the memoized items of the nonterminal after its dot
+        def closureHelper(kernel:dict) -> dict:
+            base = {}
+            for core in kernel:
+                base[core] = base.get(core, 0) | kernel[core]
+            for core in kernel:
+                if not core in expand:
+                    continue
+                (next_token, bits, nullable) = expand[core]
+                if nullable:
+                    bits |= kernel[core]
+                key = (next_token, bits)
+                added = expand_memo.get(key)
+                if added is None:
+                    stats["expand_misses"] += 1
+                    alternatives = {}
+                    for prod_id in prod_alternatives[next_token]:
+                        alternatives[(prod_id, start_pos[prod_id])] = bits
+                    added = closeItems(alternatives, {})
+                    expand_memo[key] = added
+                else:
+                    stats["expand_hits"] += 1
+                for new_core in added:
+                    base[new_core] = base.get(new_core, 0) | added[new_core]
+            return base
         
-        def GoHelper(iset:frozenset):
-
+        # returns the kernel (the advanced items, not yet closed) for every token
+        def GoHelper(closure:dict) -> dict:
             ret_tmp = {}
+            for (prod_id, pos) in closure:
+                right_tokens = prod_list[prod_id][1]
+                if pos != len(right_tokens):
+                    next_token = right_tokens[pos]
+                    if not next_token in ret_tmp:
+                        ret_tmp[next_token] = {}
+                    ret_tmp[next_token][(prod_id, pos + 1)] = closure[(prod_id, pos)]
+            return ret_tmp
+        
+        start_prod_id = prod_alternatives[self.argument_token][0]
+        start_kernel = {(start_prod_id, 0) : 1 << self.terminal_index[self.guard_token]}
+        first_closure = closureHelper(start_kernel)
 
-            def goHelperStub(item:Item) -> Item:
-                new_item = copy(item)
-                new_item.pos = new_item.pos + 1
-                return new_item
+        lalr = self.mode == LRAnalyzer.Mode.LALR1
 
-            for item in iset:
-                item : Item
-                
-                if item.closureGoable():
-                    new_item = goHelperStub(item)
-                    next_token = item.right_tokens[item.pos]
-                    if not next_token in ret_tmp.keys():
-                        ret_tmp[next_token] = []
-                    ret_tmp[next_token].append(new_item)
-
-            jmp_tmp = {}
-            for x in ret_tmp:
-                jmp_tmp[x] = closureHelper(frozenset(ret_tmp[x]))
-            return jmp_tmp
-        
-        start_item = Item(self.argument_token, [self.orginal_start_token], 0, self.guard_token)
-        start_set = frozenset([start_item])
-        first_closure = closureHelper(start_set)
+        # in LALR1 mode states are identified by their core,
+        # the kernel items without the preview tokens
+        def kernelKey(kernel:dict) -> frozenset:
+            if lalr:
+                return frozenset(kernel.keys())
+            return frozenset(kernel.items())
 
         
-        # used to temporary sotrage
-        closure_stack = [first_closure]
+        # used to temporary sotrage, holds state ids
+        closure_stack = [0]
+
+        # maps the kernel of a closure to its state id, a kernel determines
+        # its closure, so it is used instead of searching the closures
+        kernel_index = {kernelKey(start_kernel) : 0}
 
-        # to check if the set is unique in list named closure_stack
-        closures_unique = set()
-        closures_unique.add(first_closure)
+        # the kernel of every state, grows when LALR1 mode merges states
+        state_kernels = [start_kernel]
 
         # it is a dict of dicts
         # can be used like : closures_jump_table[state][token]
         closures_jump_table = {}
 
-        closures_storage = [first_closure]
+        closures = [first_closure]
         
         goto_table = {}
         while len(closure_stack) != 0:
-            cur = closure_stack.pop()
-            closure_go_dict = GoHelper(cur)
-            state = closures_storage.index(cur)
+            state = closure_stack.pop()
+            closure_go_dict = GoHelper(closures[state])
             if not state in closures_jump_table.keys():
                 closures_jump_table[state] = {}
                 goto_table[state] = {}
             
             for k in closure_go_dict.keys():
-                if not closure_go_dict[k] in closures_unique:
-                    closures_storage.append(closure_go_dict[k])
-                    closures_unique.add(closure_go_dict[k])
-                    closure_stack.append(closure_go_dict[k])
+                kernel = closure_go_dict[k]
+                key = kernelKey(kernel)
+                next_state = kernel_index.get(key)
+                if next_state is None:
+                    stats["kernel_misses"] += 1
+                    next_state = len(closures)
+                    closures.append(closureHelper(kernel))
+                    kernel_index[key] = next_state
+                    state_kernels.append(kernel)
+                    closure_stack.append(next_state)
+                else:
+                    # the kernel was closed before, only LALR1 may add preview tokens
+                    stats["kernel_hits"] += 1
+                    if lalr:
+                        # same core, merge the new preview tokens and visit
+                        # the state again to propagate them
+                        old_kernel = state_kernels[next_state]
+                        new_items = {}
+                        for core in kernel:
+                            if kernel[core] & ~old_kernel[core]:
+                                old_kernel[core] |= kernel[core]
+                                new_items[core] = kernel[core]
+                        if len(new_items) != 0:
+                            # the closure only grows a little, propagating the
+                            # new bits in place is cheaper than the memo
+                            closeItems(new_items, closures[next_state])
+                            closure_stack.append(next_state)
                 
-                next_state = closures_storage.index(closure_go_dict[k])
                 closures_jump_table[state][k] = next_state
                 if k.isNonTerminal():
                     goto_table[state][k] = next_state
+
+        closures_storage = []
+        for closure in closures:
+            items = []
+            for (prod_id, pos) in closure:
+                (left_token, right_tokens) = prod_list[prod_id]
+                items.append(Item(prod_id, left_token, right_tokens, pos, closure[(prod_id, pos)], self.terminal_list))
+            closures_storage.append(frozenset(items))
         
         self.closures_storage = closures_storage
+        self.kernel_index = kernel_index
         self.closures_jump_table = closures_jump_table
         self.goto_table = goto_table
+        self.closure_stats = stats
+        self.expand_memo = expand_memo
 
     
-    # return true if the grammar satisify the LR(1)
+    # return true if the grammar satisify the LR(1), or LALR(1) in LALR1 mode
     # action table will be a dict of dicts of list
-    # return type : (LR(1) check result, list of indics of closures which conflict)
-    def generateAction(self) -> tuple:
+    # return type : list of (state, terminal) of the conflicting cells
+    def generateAction(self) -> list:
+        phase_start = time.perf_counter()
         action = {}
         terminals_tmp = []
         for k in self.ttab.tokens:
             if self.ttab.getToken(k).isTerminal():
                 terminals_tmp.append(self.ttab.getToken(k))
 
+        # conflicts are found while the cells are filled, a cell conflicts when an action
+        # is added to a non empty cell and either of them is a reduce. A cell not reported
+        # yet holds only shifts or a single reduce, so checking its first action is enough
+        conflicts_list = []
+        conflict_cells = set()
+        reduce_type = LRAnalyzer.ActionType.Reduce
+
+        def addAction(row:dict, state:int, terminal, entry:tuple):
+            cell = row[terminal]
+            if len(cell) != 0 and (entry[0] == reduce_type or cell[0][0] == reduce_type) \
+                and not (state, terminal) in conflict_cells:
+                conflict_cells.add((state, terminal))
+                conflicts_list.append((state, terminal))
+            cell.append(entry)
+
         closures_num = len(self.closures_storage)
         state = 0
         while state < closures_num:
-            action[state] = {}
+            row = {}
             for terminal in terminals_tmp:
-                action[state][terminal] = []
+                row[terminal] = []
+            action[state] = row
             
             cur_closure = self.closures_storage[state]
 
             for item in cur_closure:
                 item:Item
                 if item.canShift():
-                    action[state][item.right_tokens[item.pos]].append((LRAnalyzer.ActionType.Shift, item))
+                    addAction(row, state, item.right_tokens[item.pos], (LRAnalyzer.ActionType.Shift, item))
                 elif item.canReduce():
-                    action[state][item.preview_token].append((LRAnalyzer.ActionType.Reduce, item))
+                    for preview_token in item.previewTokens():
+                        addAction(row, state, preview_token, (LRAnalyzer.ActionType.Reduce, item))
 
             state += 1
+
+        # shift/reduce conflicts decided by precedence leave a single action in the cell,
+        # or none for a %nonassoc terminal, the others stay in the list
+        resolved = 0
+        if len(self.token_precedence) != 0:
+            unresolved = []
+            for (state, terminal) in conflicts_list:
+                cell = self.resolveByPrecedence(action[state][terminal], terminal)
+                if cell == None:
+                    unresolved.append((state, terminal))
+                else:
+                    action[state][terminal] = cell
+                    resolved += 1
+            conflicts_list = unresolved
+        self.stats.counts["resolved_conflicts"] = resolved
+
         self.action_table = action
+        self.conflict_reports = None
+        self.stats.addPhase("action", phase_start)
 
-        # check conflicts in action table
+        return conflicts_list 
 
-        conflicts_list = []
-        state = 0
-        while state < closures_num:
-            for terminal in action[state]:
-                action_list = action[state][terminal]
-                reduce_cnt = 0
-                shift_cnt = 0
-                for (action_type, item) in action_list:
-                    if action_type == LRAnalyzer.ActionType.Reduce:
-                        reduce_cnt += 1
-                    if action_type == LRAnalyzer.ActionType.Shift:
-                        shift_cnt += 1
-                
-                if (reduce_cnt > 1) or (reduce_cnt > 0 and shift_cnt > 0):
-                    conflicts_list.append((state, terminal))
-            state += 1
+    # the actions left in a shift/reduce conflict cell by the precedence of the terminal
+    # and of the reduced production, None when precedence does not decide it
+    def resolveByPrecedence(self, cell:list, terminal:Token):
+        shifts = []
+        reduces = []
+        for entry in cell:
+            if entry[0] == LRAnalyzer.ActionType.Shift:
+                shifts.append(entry)
+            else:
+                reduces.append(entry)
+        if len(shifts) == 0 or len(reduces) != 1:
+            return None
+        token_prec = self.token_precedence.get(terminal.val)
+        prod_prec = self.prod_precedence[reduces[0][1].prod_id]
+        if token_prec == None or prod_prec == None:
+            return None
+
+        if prod_prec[0] > token_prec[0]:
+            return reduces
+        if prod_prec[0] < token_prec[0]:
+            return shifts
+        if token_prec[1] == LRAnalyzer.Assoc.Left:
+            return reduces
+        if token_prec[1] == LRAnalyzer.Assoc.Right:
+            return shifts
+        return []
+
+    # the shortest token prefix reaching every state from state 0, found by a breadth first
+    # search over closures_jump_table, prefixes[state] is a list of tokens
+    def statePrefixes(self) -> list:
+        prefixes = [None] * len(self.closures_storage)
+        prefixes[0] = []
+        queue = collections.deque([0])
+        while len(queue) != 0:
+            state = queue.popleft()
+            for (token, next_state) in self.closures_jump_table[state].items():
+                if prefixes[next_state] == None:
+                    prefixes[next_state] = prefixes[state] + [token]
+                    queue.append(next_state)
+        return prefixes
+
+    # the conflicts with the competing actions and an example prefix, computed on the first call
+    def getConflictReports(self) -> list:
+        if self.action_table == None:
+            raise ValueError("conflict reports need the closures, the table was loaded from a cache")
+        if self.conflict_reports == None:
+            prefixes = self.statePrefixes()
+            reports = []
+            for (state, terminal) in self.conflict_list:
+                reports.append(ConflictReport(state, terminal, self.action_table[state][terminal], prefixes[state]))
+            self.conflict_reports = reports
+        return self.conflict_reports
+    
+    # pack action_table and goto_table into a ParseTable
+    # a conflicting cell keeps the shift, or the reduce with the smallest production id
+    # it is always the full table, after compress() analyze uses the full one again.
+    # A table loaded from a cache is returned as it is, it can not be rebuilt
+    def compile(self) -> ParseTable:
+        if self.action_table == None:
+            if self.parse_table == None or isinstance(self.parse_table, CompressedParseTable):
+                raise ValueError("the full table can not be rebuilt, the table was loaded from a cache")
+            return self.parse_table
+        phase_start = time.perf_counter()
+        terminals = [x.val for x in self.getTerminal()]
+        terminals.sort()
+        nonterminals = [x.val for x in self.getNonTerminal()]
+        nonterminals.sort()
+
+        prod_lhs = []
+        prod_len = []
+        for (left_token, right_tokens) in self.prod_list:
+            prod_lhs.append(nonterminals.index(left_token.val))
+            if right_tokens[0] == self.eplision:
+                prod_len.append(0)
+            else:
+                prod_len.append(len(right_tokens))
 
+        table = ParseTable(len(self.closures_storage), terminals, nonterminals, prod_lhs, prod_len,
+                           terminals.index(self.guard_token.val))
 
-        return conflicts_list 
+        for state in self.action_table:
+            for terminal in self.action_table[state]:
+                actions_list = self.action_table[state][terminal]
+                if len(actions_list) == 0:
+                    continue
+                value = None
+                for (action_type, item) in actions_list:
+                    if action_type == LRAnalyzer.ActionType.Shift:
+                        value = ParseTable.shiftValue(self.closures_jump_table[state][terminal])
+                        break
+                    if value == None or item.prod_id < -value - 1:
+                        value = ParseTable.reduceValue(item.prod_id)
+                table.action[state * table.action_width + table.term_ids[terminal.val]] = value
+
+        for state in self.goto_table:
+            for nonterminal in self.goto_table[state]:
+                table.goto[state * table.goto_width + table.nonterm_ids[nonterminal.val]] = self.goto_table[state][nonterminal]
+
+        self.parse_table = table
+        self.stats.addPhase("compile", phase_start)
+        self.stats.counts["table_bytes"] = table.sizeInBytes()
+        return table
+
+    # replace the parse table used by analyze with a CompressedParseTable
+    def compress(self) -> CompressedParseTable:
+        if self.parse_table == None:
+            self.compile()
+        if not isinstance(self.parse_table, CompressedParseTable):
+            phase_start = time.perf_counter()
+            self.parse_table = CompressedParseTable(self.parse_table)
+            self.stats.addPhase("compress", phase_start)
+            self.stats.counts["table_bytes"] = self.parse_table.sizeInBytes()
+        return self.parse_table
     
     def getSentenceByStr(self, s:str):
         ret_tokens = []
@@ -568,6 +2115,13 @@ class LRAnalyzer:
         return self.action_table
     
     def debug_log(self):
+        if self.closures_jump_table == None:
+            print("TABLES_FROM_CACHE")
+            print("CONFLICTS_START")
+            for x in self.conflict_list:
+                print(x)
+            print("CONFLICTS_END")
+            return
         
         print("CLOSURES_JUMP_TABLE_START")
         l = list(self.closures_jump_table.keys())
@@ -594,193 +2148,82 @@ class LRAnalyzer:
     def __repr__(self) -> str:
         return self.__str()
 
-class MainWindow(QMainWindow):
-
-    def __init__(self):
-        super(MainWindow, self).__init__()
-        ui_file_name = "lab3.ui"
-        ui_file = QFile(ui_file_name)
-        if not ui_file.open(QIODevice.ReadOnly):
-            print("Cannot open {}: {}".format(ui_file_name, ui_file.errorString()))
-            sys.exit(-1)
-        loader = QUiLoader()
-        window = loader.load(ui_file)
-        ui_file.close()
-        self.setCentralWidget(window)
-
-        self.textedit_focus_status = False
-        self.button:QPushButton = window.analysis
-        self.button.clicked.connect(self.button_clicked)
-        self.textedit:QTextEdit = window.productions
-        self.lineedit:QLineEdit = window.sentence
-        self.label:QLabel = window.check_status
-        self.sentence_status_label:QLabel = window.sentence_status
-        
-        self.tabwidget:QTabWidget = window.tabwidget
 
-    @Slot()
-    def button_clicked(self):
-        pstrs = self.textedit.toPlainText().strip().split("\n")
-        senstr = self.lineedit.text().strip()
-        lra = LRAnalyzer(pstrs, "?", "START", "#")
-        lra.debug_log()
+# command line entry point, returns the exit status
+# lab3.py GRAMMAR [SENTENCES] parses one sentence per line of SENTENCES ("-" is stdin),
+# the grammar is one production per line as in testcase/
+def main(argv:list) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog = "lab3.py", description = "LR(1) / LALR(1) parser without the GUI")
+    parser.add_argument("grammar", help = "grammar file, one production per line")
+    parser.add_argument("sentences", nargs = "?", help = "sentence file, one sentence per line, - is stdin")
+    parser.add_argument("--format", choices = ["text", "json"], default = "text", help = "output format")
+    parser.add_argument("--mode", choices = ["lr1", "lalr1"], default = "lr1")
+    parser.add_argument("--cache", help = "directory of the parse table cache")
+    parser.add_argument("--mapped", action = "store_true", help = "map cached tables instead of reading them")
+    parser.add_argument("--compress", action = "store_true", help = "parse with the compressed table")
+    parser.add_argument("--workers", type = int, default = 1, help = "worker processes for the sentences")
+    parser.add_argument("--stats", help = "write the AnalyzerStats as JSON to this file")
+    parser.add_argument("--conflicts", action = "store_true",
+                        help = "describe every conflict with its items and an example prefix")
+    parser.add_argument("--epsilon", default = "?")
+    parser.add_argument("--start", default = "START", help = "name of the argumented start symbol")
+    parser.add_argument("--guard", default = "#", help = "end of sentence token")
+    args = parser.parse_args(argv)
+    if args.mapped and args.cache == None:
+        parser.error("--mapped needs --cache")
+
+    f = open(args.grammar, "r")
+    pstrs = f.read().strip().split("\n")
+    f.close()
 
-        if lra.checkLR():
-            self.label.setText("LR(1) check passed")
+    table_cache = None
+    if args.cache != None:
+        table_cache = TableCache(args.cache, mapped = args.mapped)
+    mode = [LRAnalyzer.Mode.LR1, LRAnalyzer.Mode.LALR1][["lr1", "lalr1"].index(args.mode)]
+    lra = LRAnalyzer(pstrs, args.epsilon, args.start, args.guard, mode, table_cache)
+    if args.compress:
+        lra.compress()
+
+    conflicts = [(state, t.val) for (state, t) in lra.conflict_list]
+    if args.sentences == None:
+        if args.format == "json":
+            import json
+            json.dump({"states" : lra.stateCount(), "lr_check" : lra.checkLR(), "conflicts" : conflicts}, sys.stdout)
+            sys.stdout.write("\n")
         else:
-            self.label.setText("LR(1) check failed, but still can be used to parse")
-        
-        (sentence_status, sentence) = lra.getSentenceByStr(senstr)
-
-        if not sentence_status:
-            self.sentence_status_label.setText("Unexpected tokens in the Sentence")
-            return
-        
-        analyze_status, out_list = lra.analyze(sentence)
-
-        if analyze_status:
-            self.sentence_status_label.setText("Sentence Accepted")
-        else: 
-            self.sentence_status_label.setText("Sentence Not Accepted")
-
-        # left to right is:
-        # PROCESS, ACTION GOTO, DFA
-
-        self.tabwidget.clear()
-
-        process_tab = QTableWidget(len(out_list), 4)
-        i = 0
-        for (s,t,r,info) in out_list:
-            s_item = QTableWidgetItem(str(s))
-            process_tab.setItem(i, 0, s_item)
-            
-            t_str = [x.val for x in t]
-            t_item = QTableWidgetItem(str(t_str))
-            process_tab.setItem(i, 1, t_item)
-            r_str = [x.val for x in r]
-            r_item = QTableWidgetItem(str(r_str))
-            process_tab.setItem(i, 2, r_item)
-
-            i_item = QTableWidgetItem(str(info))
-            process_tab.setItem(i, 3, i_item)
-            i += 1
-        process_tab.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        print(out_list)
-        process_tab.setHorizontalHeaderLabels(["States", "Tokens", "Inputs", "Actions"])
-        self.tabwidget.addTab(process_tab,"PROCESS")
-
-        states_num = lra.stateCount()
-        nterm_num = lra.nonTerminalCount()
-        term_num = lra.terminalCount()
-
-        nterms = [x.val for x in lra.getNonTerminal()]
-        nterms.sort()
-        terms = [x.val for x in lra.getTerminal()]
-        terms.sort()
-
-        action_tab = QTableWidget(states_num, term_num)
-
-        print(terms)
-        print(nterms)
-        print(term_num)
-        i = 0
-        while i < states_num:
-            j = 0
-            while j < term_num:
-                action = lra.action_table[i][lra.ttab.getToken(terms[j])]
-                if len(action) == 0:
-                    pass
-                else:
-                    item_str = ""
-                    tmp_str_tab = ["Shift", "Reduce"]
-                    t,p = action[0]
-                    if lra.ttab.getToken(terms[j]) in lra.closures_jump_table[i]:
-                        item_str = item_str + str(lra.closures_jump_table[i][lra.ttab.getToken(terms[j])])
-                    tmp_action = [(tmp_str_tab[t], p) for (t,p) in action]
-                    item = QTableWidgetItem(item_str + str(tmp_action))
-                    action_tab.setItem(i,j, item)
-                j += 1
-            i = i + 1
-        
-        action_tab.setHorizontalHeaderLabels(terms)
-        self.tabwidget.addTab(action_tab, "ACTION")
-
-
-        goto_tab = QTableWidget(states_num, nterm_num)
-
-        i = 0
-        while i < states_num:
-            j = 0
-            while j < nterm_num:
-                if lra.ttab.getToken(nterms[j]) in lra.closures_jump_table[i]:
-                    print("in")
-                    item = QTableWidgetItem(str(lra.closures_jump_table[i][lra.ttab.getToken(nterms[j])]))
-                    goto_tab.setItem(i, j, item)
-                else:
-                    pass
-                j = j + 1
-            i = i + 1
-        
-        goto_tab.setHorizontalHeaderLabels(nterms)
-        self.tabwidget.addTab(goto_tab, "GOTO")
-
-
-        dfa_tab = QLabel()
-
-        graph = Digraph("DFA", format="png")
-
-        final_state = set()
-        render_tuple = []
-        for state in lra.closures_jump_table:
-            flag = True 
-            for token in lra.closures_jump_table[state]:
-                flag = False 
-                next_state = lra.closures_jump_table[state][token]
-                tmp_tuple = (state, next_state, token.val)
-                render_tuple.append(tmp_tuple)
-            if flag:
-                final_state.add(state)
-
-        graph.attr("node", shape="doublecircle")
-        graph.node("0")
-        for (x,y,t) in render_tuple:
-            if y in final_state:
-                graph.attr("node", shape="doublecircle")
-                graph.node(str(y))
-            graph.attr("node", shape= "circle")
-            graph.edge(str(x), str(y), label=t)
-        graph.render()
-
+            print("states: {}".format(lra.stateCount()))
+            print("conflicts: {}".format(len(conflicts)))
+            if args.conflicts and lra.getAction() != None:
+                for x in lra.getConflictReports():
+                    print("  " + str(x))
+            else:
+                for (state, t) in conflicts:
+                    print("  state {} on {}".format(state, t))
+    else:
+        status_str = ["accepted", "rejected", "unknown_token"]
+        if args.sentences == "-":
+            f = sys.stdin
+        else:
+            f = open(args.sentences, "r")
+        out = sys.stdout
+        for (index, status) in lra.parseBatch(f, args.workers):
+            if args.format == "json":
+                out.write('{{"index": {}, "status": "{}"}}\n'.format(index, status_str[status]))
+            else:
+                out.write("{} {}\n".format(index, status_str[status]))
+        if f != sys.stdin:
+            f.close()
 
-        pic = QPixmap("./DFA.gv.png")
-        dfa_tab.setPixmap(pic)
-        scroll_area = QScrollArea()
-        scroll_area.setWidget(dfa_tab)
-        self.tabwidget.addTab(scroll_area, "DFA")
+    if args.stats != None:
+        lra.stats.dump(args.stats)
+    return 0
 
 
 if __name__ == "__main__":
-    
-    '''
-    f = open("/home/doot/projects/compiler/lab3/testcase/case3.txt", "r")
-    plist = f.readlines()
-    f.close()
-    lra = LRAnalyzer(plist, "?", "START", "END")
-    lra.debug_log()
-    sentence = lra.getSentenceByStr("i * i + i + i + i")
-
-    (status, out_str) = lra.analyze(sentence)
-    print(status)
-    for x in out_str:
-        print(x)
-
-    '''
-    app = QApplication(sys.argv)
-
-    window = MainWindow()
-    window.show()
-    sys.exit(app.exec_())
-
-
-    
-    
+    if len(sys.argv) == 1:
+        # without arguments it is the GUI, as before
+        import lab3gui
+        lab3gui.main()
+    else:
+        sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,194 @@
+import sys
+
+from PySide2.QtCore import *
+from PySide2.QtGui import QPixmap
+from PySide2.QtWidgets import *
+from PySide2.QtUiTools import *
+
+from lab3 import LRAnalyzer
+
+class MainWindow(QMainWindow):
+
+    def __init__(self):
+        super(MainWindow, self).__init__()
+        ui_file_name = "lab3.ui"
+        ui_file = QFile(ui_file_name)
+        if not ui_file.open(QIODevice.ReadOnly):
+            print("Cannot open {}: {}".format(ui_file_name, ui_file.errorString()))
+            sys.exit(-1)
+        loader = QUiLoader()
+        window = loader.load(ui_file)
+        ui_file.close()
+        self.setCentralWidget(window)
+
+        self.textedit_focus_status = False
+        self.button:QPushButton = window.analysis
+        self.button.clicked.connect(self.button_clicked)
+        self.textedit:QTextEdit = window.productions
+        self.lineedit:QLineEdit = window.sentence
+        self.label:QLabel = window.check_status
+        self.sentence_status_label:QLabel = window.sentence_status
+        
+        self.tabwidget:QTabWidget = window.tabwidget
+
+        # the analyzer of the last click, reused while the productions are unchanged
+        self.lra = None
+        self.lra_pstrs = None
+
+    @Slot()
+    def button_clicked(self):
+        pstrs = self.textedit.toPlainText().strip().split("\n")
+        senstr = self.lineedit.text().strip()
+        if self.lra == None or self.lra_pstrs != pstrs:
+            # an edit of a few productions reuses the closures of the rest
+            self.lra = LRAnalyzer(pstrs, "?", "START", "#", previous = self.lra)
+            self.lra_pstrs = pstrs
+        lra = self.lra
+        lra.debug_log()
+
+        if lra.checkLR():
+            self.label.setText("LR(1) check passed")
+        else:
+            self.label.setText("LR(1) check failed, but still can be used to parse")
+        
+        (sentence_status, sentence) = lra.getSentenceByStr(senstr)
+
+        if not sentence_status:
+            self.sentence_status_label.setText("Unexpected tokens in the Sentence")
+            return
+        
+        analyze_status, out_list = lra.analyze(sentence)
+
+        if analyze_status:
+            self.sentence_status_label.setText("Sentence Accepted")
+        else: 
+            self.sentence_status_label.setText("Sentence Not Accepted")
+
+        # left to right is:
+        # PROCESS, ACTION GOTO, DFA
+
+        self.tabwidget.clear()
+
+        process_tab = QTableWidget(len(out_list), 4)
+        i = 0
+        for (s,t,r,info) in out_list:
+            s_item = QTableWidgetItem(str(s))
+            process_tab.setItem(i, 0, s_item)
+            
+            t_str = [x.val for x in t]
+            t_item = QTableWidgetItem(str(t_str))
+            process_tab.setItem(i, 1, t_item)
+            r_str = [x.val for x in r]
+            r_item = QTableWidgetItem(str(r_str))
+            process_tab.setItem(i, 2, r_item)
+
+            i_item = QTableWidgetItem(str(info))
+            process_tab.setItem(i, 3, i_item)
+            i += 1
+        process_tab.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        print(out_list)
+        process_tab.setHorizontalHeaderLabels(["States", "Tokens", "Inputs", "Actions"])
+        self.tabwidget.addTab(process_tab,"PROCESS")
+
+        states_num = lra.stateCount()
+        nterm_num = lra.nonTerminalCount()
+        term_num = lra.terminalCount()
+
+        nterms = [x.val for x in lra.getNonTerminal()]
+        nterms.sort()
+        terms = [x.val for x in lra.getTerminal()]
+        terms.sort()
+
+        action_tab = QTableWidget(states_num, term_num)
+
+        print(terms)
+        print(nterms)
+        print(term_num)
+        i = 0
+        while i < states_num:
+            j = 0
+            while j < term_num:
+                action = lra.action_table[i][lra.ttab.getToken(terms[j])]
+                if len(action) == 0:
+                    pass
+                else:
+                    item_str = ""
+                    tmp_str_tab = ["Shift", "Reduce"]
+                    t,p = action[0]
+                    if lra.ttab.getToken(terms[j]) in lra.closures_jump_table[i]:
+                        item_str = item_str + str(lra.closures_jump_table[i][lra.ttab.getToken(terms[j])])
+                    tmp_action = [(tmp_str_tab[t], p) for (t,p) in action]
+                    item = QTableWidgetItem(item_str + str(tmp_action))
+                    action_tab.setItem(i,j, item)
+                j += 1
+            i = i + 1
+        
+        action_tab.setHorizontalHeaderLabels(terms)
+        self.tabwidget.addTab(action_tab, "ACTION")
+
+
+        goto_tab = QTableWidget(states_num, nterm_num)
+
+        i = 0
+        while i < states_num:
+            j = 0
+            while j < nterm_num:
+                if lra.ttab.getToken(nterms[j]) in lra.closures_jump_table[i]:
+                    print("in")
+                    item = QTableWidgetItem(str(lra.closures_jump_table[i][lra.ttab.getToken(nterms[j])]))
+                    goto_tab.setItem(i, j, item)
+                else:
+                    pass
+                j = j + 1
+            i = i + 1
+        
+        goto_tab.setHorizontalHeaderLabels(nterms)
+        self.tabwidget.addTab(goto_tab, "GOTO")
+
+
+        dfa_tab = QLabel()
+
+        # graphviz is only needed for this tab
+        from graphviz import Digraph
+        graph = Digraph("DFA", format="png")
+
+        final_state = set()
+        render_tuple = []
+        for state in lra.closures_jump_table:
+            flag = True 
+            for token in lra.closures_jump_table[state]:
+                flag = False 
+                next_state = lra.closures_jump_table[state][token]
+                tmp_tuple = (state, next_state, token.val)
+                render_tuple.append(tmp_tuple)
+            if flag:
+                final_state.add(state)
+
+        graph.attr("node", shape="doublecircle")
+        graph.node("0")
+        for (x,y,t) in render_tuple:
+            if y in final_state:
+                graph.attr("node", shape="doublecircle")
+                graph.node(str(y))
+            graph.attr("node", shape= "circle")
+            graph.edge(str(x), str(y), label=t)
+        graph.render()
+
+
+        pic = QPixmap("./DFA.gv.png")
+        dfa_tab.setPixmap(pic)
+        scroll_area = QScrollArea()
+        scroll_area.setWidget(dfa_tab)
+        self.tabwidget.addTab(scroll_area, "DFA")
+
+
+def main():
+    app = QApplication(sys.argv)
+
+    window = MainWindow()
+    window.show()
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from lab3 import LRAnalyzer, TableCache
+
+
+def build(pstrs:list, table_cache = None, previous = None) -> LRAnalyzer:
+    return LRAnalyzer(pstrs, "?", "START", "#", table_cache = table_cache, previous = previous)
+
+
+# the evaluated sentence shows how the operators were grouped
+infix_actions = {"E -> E + E" : lambda l, op, r : "({}+{})".format(l, r),
+                 "E -> E - E" : lambda l, op, r : "({}-{})".format(l, r),
+                 "E -> int" : lambda x : "int"}
+
+
+class TableCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    # the grammars only differ in the level of -, which decides the conflicts
+    # with - as the lookahead terminal
+    def testTerminalPrecedence(self):
+        same_level = ["%left + -", "E -> E + E | E - E %prec + | int"]
+        minus_tighter = ["%left +", "%left -", "E -> E + E | E - E %prec + | int"]
+        sentence = "int + int - int".split()
+        expected = {}
+        for pstrs in [same_level, minus_tighter]:
+            expected[pstrs[0]] = build(pstrs).evaluate(sentence, infix_actions)
+        self.assertNotEqual(expected[same_level[0]], expected[minus_tighter[0]])
+
+        cache = TableCache(self.path)
+        for pstrs in [same_level, minus_tighter]:
+            build(pstrs, cache)
+        for pstrs in [same_level, minus_tighter]:
+            lra = build(pstrs, cache)
+            self.assertEqual(lra.action_table, None)
+            self.assertEqual(lra.evaluate(sentence, infix_actions), expected[pstrs[0]])
+
+    # the action table is not stored, the conflicting actions are gone on a cache hit
+    def testResolverOnCachedTable(self):
+        pstrs = ["E -> E + E | int"]
+        cache = TableCache(self.path)
+        build(pstrs, cache)
+        lra = build(pstrs, cache)
+        (status, sentence) = lra.getSentenceByStr("int + int + int")
+        self.assertTrue(status)
+        self.assertTrue(lra.analyze(sentence)[0])
+        with self.assertRaises(ValueError):
+            lra.analyze(sentence, lambda actions : 0)
+        with self.assertRaises(ValueError):
+            lra.getConflictReports()
+        # the loaded table is the compiled one, once compressed it can not be rebuilt
+        self.assertIs(lra.compile(), lra.parse_table)
+        lra.compress()
+        self.assertTrue(lra.analyze(sentence)[0])
+        with self.assertRaises(ValueError):
+            lra.compile()
+
+
+class SourceTest(unittest.TestCase):
+
+    def setUp(self):
+        f = open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "testcase", "case3.txt"), "r")
+        self.lra = build(f.read().strip().split("\n"))
+        f.close()
+
+    # a str is split on whitespace, not iterated by chars
+    def testStrSource(self):
+        for source in [lambda : "int + int", lambda : "int + int".split(), lambda : io.StringIO("int +\n int")]:
+            self.assertTrue(self.lra.parseStream(source()))
+            self.assertNotEqual(self.lra.parseTree(source()), None)
+            self.assertTrue(self.lra.evaluate(source(), {})[0])
+        self.assertFalse(self.lra.parseStream("int +"))
+
+    def testStrBatch(self):
+        statuses = [status for (index, status) in self.lra.parseBatch("int + int\nint +\nint ^", 1)]
+        self.assertEqual(statuses, [LRAnalyzer.SentenceStatus.Accepted, LRAnalyzer.SentenceStatus.Rejected,
+                                    LRAnalyzer.SentenceStatus.UnknownToken])
+
+    # the statuses come back in input order with any number of workers
+    def testBatchWorkers(self):
+        sentences = ["int + int", "int +", "int ^", "( int ) * int"] * 25
+        expected = [status for (index, status) in self.lra.parseBatch(sentences, 1)]
+        for workers in [2, 4]:
+            ret = list(self.lra.parseBatch(sentences, workers))
+            self.assertEqual([index for (index, status) in ret], list(range(len(sentences))))
+            self.assertEqual([status for (index, status) in ret], expected)
+
+
+class IncrementalTest(unittest.TestCase):
+
+    def assertSameBuild(self, lra:LRAnalyzer, fresh:LRAnalyzer):
+        self.assertEqual(lra.checkLR(), fresh.checkLR())
+        self.assertEqual(len(lra.conflict_list), len(fresh.conflict_list))
+        self.assertEqual(sorted([sorted([str(x) for x in c]) for c in lra.getClosures()]),
+                         sorted([sorted([str(x) for x in c]) for c in fresh.getClosures()]))
+
+    # A -> a | a is a reduce/reduce conflict, the reused entries of A must keep both copies
+    def testDuplicateAlternatives(self):
+        previous = build(["E -> y A x | y", "A -> a | a"])
+        edited = ["E -> y A x | y y", "A -> a | a"]
+        lra = build(edited, previous = previous)
+        self.assertNotEqual(lra.closure_stats["expand_reused"], 0)
+        self.assertFalse(lra.checkLR())
+        self.assertSameBuild(lra, build(edited))
+
+    def testEditedLevel(self):
+        pstrs = ["E -> E + T | T", "T -> T * F | F", "F -> ( E ) | id"]
+        previous = build(pstrs)
+        for edited in [["E -> E + T | E - T | T"] + pstrs[1:], pstrs[:2] + ["F -> ( E ) | id | num"]]:
+            self.assertSameBuild(build(edited, previous = previous), build(edited))
+
+
+if __name__ == "__main__":
+    unittest.main()